@@ -0,0 +1,213 @@
+"""تنبيهات أسبوع مقابل أسبوع لكل فرع ولكل يوم، تُحسب مرة عند بناء اللقطة.
+
+    python alerting.py [--date-from D] [--date-to D] [--branch B] [--rules rules.json] [--set sales_change=-25:red,0:orange]
+
+لكل يوم d في التقويم: مجموع [d-6، d] مقابل [d-13، d-7] لكل الفروع دفعة واحدة
+من DailyIndex.cum. «التنبيهات في تاريخ ما» قراءة عمود واحد، وتجربة عتبات
+جديدة على كل التاريخ مقارنات مصفوفات بلا إعادة تجميع.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from rangeindex import parse_date
+
+WINDOW_DAYS = 7
+DAY = np.timedelta64(1, 'D')
+# لكل قاعدة (العتبة، المستوى) تصاعدياً: التنبيه عند القيمة < العتبة، وأول عتبة تنطبق تحدد المستوى
+DEFAULT_RULES = {
+    'sales_change': ((-20, 'red'), (0, 'orange')),
+    'profit_change': ((-20, 'red'),),
+    'margin': ((10, 'red'), (20, 'orange')),
+}
+RULES_FILE = os.environ.get('DASHBOARD_ALERT_RULES')
+SUMS = ('sales', 'profit', 'rows')
+EVENT_COLUMNS = ['SaleDate', 'branch_id', 'BranchName', 'rule', 'level', 'value']
+
+
+def parse_steps(steps):
+    return tuple(sorted((float(threshold), str(level)) for threshold, level in steps))
+
+
+def load_rules(path=RULES_FILE):
+    """القواعد الافتراضية، وفوقها ما في ملف JSON بنفس الشكل: {"margin": [[12, "red"], [25, "orange"]]}."""
+    rules = dict(DEFAULT_RULES)
+    if path:
+        with open(path, encoding='utf-8') as f:
+            for name, steps in json.load(f).items():
+                if name not in DEFAULT_RULES:
+                    raise ValueError(f'unknown alert rule {name!r}')
+                rules[name] = parse_steps(steps)
+    return rules
+
+
+def _windows(index, days):
+    """المجاميع والنسب للأيام المطلوبة؛ النسب مقربة لمنزلة كما تُعرض."""
+    hi = np.searchsorted(index.days, days, 'right')
+    mid = np.searchsorted(index.days, days - (WINDOW_DAYS - 1) * DAY, 'left')
+    lo = np.searchsorted(index.days, days - (2 * WINDOW_DAYS - 1) * DAY, 'left')
+    out = {}
+    for col in SUMS:
+        cum = index.cum[col]
+        out[f'{col}_last'] = cum[:, hi] - cum[:, mid]
+        out[f'{col}_prev'] = cum[:, mid] - cum[:, lo]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out['margin'] = np.round(out['profit_last'] / out['sales_last'] * 100, 1)
+        # فرع بلا بيانات في الأسبوع السابق: لا مقارنة
+        no_prev = out['rows_prev'] == 0
+        for col in ('sales', 'profit'):
+            change = np.round((out[f'{col}_last'] - out[f'{col}_prev']) / out[f'{col}_prev'] * 100, 1)
+            change[no_prev] = np.nan
+            out[f'{col}_change'] = change
+    return out
+
+
+class AlertTimeline:
+    """مصفوفات (فرع × يوم تقويمي) لنافذتي الأسبوعين ونسب التغير، من أول يوم في البيانات لآخره.
+
+    مع previous (خط اللقطة السابقة) تُنسخ الأيام التي لم تتغير نوافذها ويُحسب الباقي فقط،
+    فإضافة يوم جديد لملف 2026 تحسب عموداً واحداً تقريباً.
+    """
+
+    def __init__(self, index, previous=None):
+        self.branches = index.branches
+        self.names = index.names
+        if len(index.days):
+            self.days = np.arange(index.days[0], index.days[-1] + DAY, DAY)
+        else:
+            self.days = index.days[:0]
+        self._index = index
+        start = self._reusable(previous)
+        fresh = _windows(index, self.days[start:])
+        if start:
+            self.values = {k: np.concatenate([previous.values[k][:, :start], v], axis=1) for k, v in fresh.items()}
+        else:
+            self.values = fresh
+        self.recomputed_days = len(self.days) - start
+
+    def _reusable(self, previous):
+        """عدد الأيام الأولى التي لا تتغير نوافذها عن الخط السابق."""
+        index = self._index
+        if previous is None or not len(previous.days) or not len(self.days) or previous.days[0] != self.days[0] \
+                or not np.array_equal(previous.branches, self.branches):
+            return 0
+        old = previous._index
+        n = min(len(old.days), len(index.days))
+        same = old.days[:n] == index.days[:n]
+        p = n if same.all() else int(np.argmin(same))
+        # cum[:, j] مجموع الأيام قبل j؛ أول عمود يختلف يحدد آخر يوم لم يتغير
+        for col in SUMS:
+            diff = (old.cum[col][:, :p + 1] != index.cum[col][:, :p + 1]).any(axis=0)
+            if diff.any():
+                p = int(np.argmax(diff)) - 1
+        # أول يوم تغير: اليوم p في القائمة الجديدة أو القديمة، أيهما أسبق (يوم حُذف أو أُضيف)
+        changed = [d[p] for d in (old.days, index.days) if p < len(d)]
+        if changed:
+            start = int(np.searchsorted(self.days, min(changed), 'left'))
+        else:
+            start = len(self.days)
+        return min(len(previous.days), len(self.days), start)
+
+    def position(self, date):
+        ts = np.datetime64(parse_date(date))
+        if not len(self.days) or ts < self.days[0] or ts >= self.days[-1] + DAY:
+            raise ValueError(f'date {date} outside the data range')
+        return int(np.searchsorted(self.days, ts, 'right')) - 1
+
+    def bounds(self, date_from, date_to):
+        if not len(self.days):
+            return 0, 0
+        lo = np.searchsorted(self.days, np.datetime64(parse_date(date_from, self.days[0])), 'left')
+        hi = np.searchsorted(self.days, np.datetime64(parse_date(date_to, self.days[-1])), 'right')
+        return lo, max(lo, hi)
+
+    def _branch_mask(self, branch):
+        if branch is None or branch == 'all':
+            return np.ones(len(self.branches), dtype=bool)
+        return self.branches == branch
+
+    def frame(self, date, branch=None):
+        """النافذتان في يوم واحد لكل فرع له بيانات في آخر 7 أيام، مرتبة حسب branch_id."""
+        i = self.position(date)
+        keep = self._branch_mask(branch) & (self.values['rows_last'][:, i] > 0)
+        out = pd.DataFrame({'branch_id': self.branches[keep], 'BranchName': self.names[keep]})
+        for key in ('sales_last', 'profit_last', 'sales_prev', 'profit_prev', 'sales_change', 'profit_change', 'margin'):
+            out[key] = self.values[key][keep, i]
+        return out
+
+    def events(self, date_from, date_to, branch=None, rules=None):
+        """كل تنبيه في الفترة: سطر لكل (يوم، فرع، قاعدة) مرتبة بالتاريخ ثم الفرع ثم ترتيب القواعد."""
+        rules = DEFAULT_RULES if rules is None else rules
+        lo, hi = self.bounds(date_from, date_to)
+        rows = np.flatnonzero(self._branch_mask(branch))
+        active = self.values['rows_last'][rows, lo:hi] > 0
+        parts = []
+        for order, (name, steps) in enumerate(rules.items()):
+            values = self.values[name][rows, lo:hi]
+            level = np.full(values.shape, -1)
+            for j in reversed(range(len(steps))):
+                level[values < steps[j][0]] = j
+            b, d = np.nonzero(active & (level >= 0))
+            parts.append((d, rows[b], np.full(len(b), order), values[b, d],
+                          np.array([s[1] for s in steps], dtype=object)[level[b, d]], name))
+        if not parts:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        d, b, order, value = (np.concatenate([p[i] for p in parts]) for i in range(4))
+        levels = np.concatenate([p[4] for p in parts])
+        names = np.concatenate([np.full(len(p[0]), p[5], dtype=object) for p in parts])
+        sort = np.lexsort((order, b, d))
+        return pd.DataFrame({'SaleDate': self.days[lo:hi][d[sort]], 'branch_id': self.branches[b[sort]],
+                             'BranchName': self.names[b[sort]], 'rule': names[sort],
+                             'level': levels[sort], 'value': value[sort]}, columns=EVENT_COLUMNS)
+
+    def backtest(self, date_from, date_to, branch=None, rules=None):
+        """عدد التنبيهات لكل (قاعدة، مستوى، فرع) في الفترة، وعدد الأيام التي قُيمت فيها."""
+        events = self.events(date_from, date_to, branch, rules)
+        lo, hi = self.bounds(date_from, date_to)
+        rows = self._branch_mask(branch)
+        days = pd.Series((self.values['rows_last'][rows, lo:hi] > 0).sum(axis=1), index=self.branches[rows], name='days')
+        out = events.groupby(['rule', 'level', 'branch_id']).size().rename('alerts').reset_index()
+        return out.merge(days, left_on='branch_id', right_index=True, how='left')
+
+
+def _parse_set(values):
+    rules = {}
+    for item in values:
+        name, _, spec = item.partition('=')
+        if name not in DEFAULT_RULES:
+            raise SystemExit(f'unknown alert rule {name!r}')
+        rules[name] = parse_steps(step.split(':') for step in spec.split(','))
+    return rules
+
+
+def main():
+    import dataset
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--date-from')
+    parser.add_argument('--date-to')
+    parser.add_argument('--branch')
+    parser.add_argument('--rules', default=RULES_FILE)
+    parser.add_argument('--set', nargs='*', default=[], help='rule=threshold:level,...')
+    args = parser.parse_args()
+    snap = dataset.build_snapshot()
+    timeline = snap.alerts
+    date_from = args.date_from or str(timeline.days[0])[:10]
+    date_to = args.date_to or snap.max_date
+    candidate = {**load_rules(args.rules), **_parse_set(args.set)}
+    base = timeline.backtest(date_from, date_to, args.branch, DEFAULT_RULES)
+    new = timeline.backtest(date_from, date_to, args.branch, candidate)
+    out = base.merge(new, on=['rule', 'level', 'branch_id', 'days'], how='outer', suffixes=('_default', '_candidate'))
+    out[['alerts_default', 'alerts_candidate']] = out[['alerts_default', 'alerts_candidate']].fillna(0).astype(int)
+    print(f'{date_from} .. {date_to}')
+    for name, steps in candidate.items():
+        print(f'  {name:<14}{", ".join(f"<{t:g} {level}" for t, level in steps)}')
+    print()
+    with pd.option_context('display.width', 200, 'display.max_rows', 500):
+        print(out.sort_values(['rule', 'level', 'branch_id']).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""واجهة JSON لنفس أرقام الصفحات، وتصدير الفواتير والبيانات اليومية على دفعات."""
+import json
+
+import numpy as np
+from flask import Blueprint, Response, abort, jsonify, request, stream_with_context
+
+import alerting
+import forecast
+import reports
+from rangeindex import parse_date
+
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+INVOICE_EXPORT_COLUMNS = ['SaleDate', 'BranchName', 'branch_id', 'InvoiceID',
+                          'TotalSales', 'TotalCost', 'TotalProfit', 'ItemCount']
+DAILY_EXPORT_COLUMNS = ['SaleDate', 'BranchName', 'branch_id', 'sales', 'cost', 'profit', 'invoices']
+
+
+def _records(df, columns):
+    out = df[columns].copy()
+    for col in columns:
+        if out[col].dtype.kind == 'M':
+            out[col] = out[col].dt.strftime('%Y-%m-%d')
+        elif out[col].dtype.kind == 'f':
+            out[col] = out[col].round(2)
+    return json.loads(out.to_json(orient='records', force_ascii=False))
+
+
+def _dates(date_from, date_to):
+    """التاريخان كـ Timestamp؛ الفارغ وغير المفهوم 400."""
+    try:
+        return parse_date(date_from), parse_date(date_to)
+    except ValueError:
+        abort(400, description='invalid date')
+
+
+def _chunks(df, rows, columns, fmt, chunk_rows):
+    """يولد الصفوف المطلوبة على دفعات دون بناء الاستجابة كاملة في الذاكرة."""
+    for start in range(0, len(rows), chunk_rows):
+        chunk = df.take(rows[start:start + chunk_rows])[columns]
+        chunk = chunk.assign(SaleDate=chunk['SaleDate'].dt.strftime('%Y-%m-%d'))
+        if fmt == 'csv':
+            yield chunk.to_csv(index=False, header=start == 0, float_format='%.2f')
+        else:
+            lines = chunk.to_json(orient='records', lines=True, double_precision=2, force_ascii=False)
+            yield lines if lines.endswith('\n') else lines + '\n'
+    if len(rows) == 0 and fmt == 'csv':
+        yield ','.join(columns) + '\n'
+
+
+def create_api(store, alert_rules=alerting.DEFAULT_RULES):
+    api = Blueprint('api', __name__, url_prefix='/api')
+
+    @api.route('/dashboard')
+    def dashboard():
+        data = store.current
+        branch = request.args.get('branch', 'all')
+        date_from, date_to = _dates(request.args.get('date_from', data.min_date), request.args.get('date_to', data.max_date))
+        totals, branch_summary, daily = reports.dashboard_summary(data, branch, date_from, date_to)
+        return jsonify({
+            'branch': branch, 'date_from': f'{date_from:%Y-%m-%d}', 'date_to': f'{date_to:%Y-%m-%d}', 'version': data.version,
+            'totals': {k: round(float(v), 2) if k != 'invoices' else int(v) for k, v in totals.items()},
+            'branches': _records(branch_summary, ['branch_id', 'BranchName', 'sales', 'cost', 'profit', 'invoices', 'profit_pct']),
+            'daily': _records(daily, ['SaleDate', 'sales', 'cost', 'profit', 'invoices']),
+        })
+
+    @api.route('/compare')
+    def compare():
+        data = store.current
+        date_from1, date_to1 = _dates(request.args.get('date_from1', reports.COMPARE_DEFAULTS[0]),
+                                      request.args.get('date_to1', reports.COMPARE_DEFAULTS[1]))
+        date_from2, date_to2 = _dates(request.args.get('date_from2', reports.COMPARE_DEFAULTS[2]),
+                                      request.args.get('date_to2', data.max_date))
+        merged = reports.compare_periods(data, date_from1, date_to1, date_from2, date_to2)
+        return jsonify({
+            'period1': [f'{date_from1:%Y-%m-%d}', f'{date_to1:%Y-%m-%d}'],
+            'period2': [f'{date_from2:%Y-%m-%d}', f'{date_to2:%Y-%m-%d}'], 'version': data.version,
+            'branches': _records(merged.rename(columns={'cs': 'sales_change_pct', 'cp': 'profit_change_pct'}),
+                                 ['branch_id', 'BranchName', 'sales_p1', 'sales_p2', 'sales_change_pct',
+                                  'profit_p1', 'profit_p2', 'profit_change_pct']),
+        })
+
+    @api.route('/alerts')
+    def alerts():
+        data = store.current
+        branch = request.args.get('branch', 'all')
+        try:
+            date = parse_date(request.args.get('date', data.max_date))
+            frame = data.alerts.frame(date, branch)
+        except ValueError as e:
+            abort(400, description=str(e))
+        events = data.alerts.events(date, date, branch, alert_rules)
+        return jsonify({
+            'date': f'{date:%Y-%m-%d}', 'version': data.version,
+            'branches': _records(frame, list(frame.columns)),
+            'alerts': _records(events, ['branch_id', 'BranchName', 'rule', 'level', 'value']),
+        })
+
+    @api.route('/alerts/history')
+    def alerts_history():
+        """خط التنبيهات لفترة؛ مع ?summary=1 عدد التنبيهات لكل قاعدة ومستوى وفرع."""
+        data = store.current
+        branch = request.args.get('branch', 'all')
+        date_from, date_to = _dates(request.args.get('date_from', data.min_date), request.args.get('date_to', data.max_date))
+        span = {'date_from': f'{date_from:%Y-%m-%d}', 'date_to': f'{date_to:%Y-%m-%d}', 'version': data.version}
+        if request.args.get('summary') == '1':
+            out = data.alerts.backtest(date_from, date_to, branch, alert_rules)
+            return jsonify({**span, 'summary': _records(out, list(out.columns))})
+        events = data.alerts.events(date_from, date_to, branch, alert_rules)
+        return jsonify({**span, 'alerts': _records(events, list(events.columns))})
+
+    @api.route('/predictions')
+    def predictions():
+        """توقع مجموع الأفق لكل فرع مع النطاق؛ ومع ?daily=1 توقع كل يوم أيضاً."""
+        data = store.current
+        horizon = request.args.get('horizon', 7, type=int)
+        level = request.args.get('level', forecast.LEVEL, type=float)
+        branch = request.args.get('branch', 'all')
+        if not 0 < level < 1:
+            abort(400, description='level must be between 0 and 1')
+        try:
+            totals = data.forecast.totals(horizon, branch, level)
+        except ValueError as e:
+            abort(400, description=str(e))
+        out = {'horizon': horizon, 'level': level, 'version': data.version,
+               'branches': _records(totals, list(totals.columns))}
+        if request.args.get('daily') == '1':
+            daily = data.forecast.daily(horizon, branch, level)
+            out['daily'] = _records(daily, list(daily.columns))
+        return jsonify(out)
+
+    @api.route('/export/<level>')
+    def export(level):
+        data = store.current
+        fmt = request.args.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            abort(400, description=f'format must be one of {", ".join(EXPORT_FORMATS)}')
+        if level == 'invoices':
+            df, columns = data.df25, INVOICE_EXPORT_COLUMNS
+        elif level == 'daily':
+            df, columns = data.all_daily, DAILY_EXPORT_COLUMNS
+        else:
+            abort(404)
+        branch = request.args.get('branch', 'all')
+        lo, hi = _dates(request.args.get('date_from', data.min_date), request.args.get('date_to', data.max_date))
+        dates = df['SaleDate']
+        mask = ((dates >= lo) & (dates <= hi)).to_numpy()
+        if branch != 'all':
+            mask = mask & (df['branch_id'] == branch).to_numpy()
+        rows = np.flatnonzero(mask)
+        chunk_rows = min(max(request.args.get('chunk', EXPORT_CHUNK_ROWS, type=int), 1), EXPORT_CHUNK_ROWS)
+        resp = Response(stream_with_context(_chunks(df, rows, columns, fmt, chunk_rows)),
+                        mimetype=EXPORT_FORMATS[fmt])
+        resp.headers['Content-Disposition'] = f'attachment; filename={level}.{fmt}'
+        resp.headers['X-Row-Count'] = str(len(rows))
+        return resp
+
+    @api.errorhandler(400)
+    def bad_request(e):
+        return jsonify({'error': e.description}), 400
+
+    return api
@@ -1,119 +1,109 @@
-from flask import Flask, request
+from flask import Flask, Response, abort, jsonify, request
 import pandas as pd
 import plotly.graph_objects as go
 import os
+import alerting
+import api
+import charts
+import dataset
+import metrics
+import reports
+from rangeindex import parse_date
+from pagecache import PageCache
 
 app = Flask(__name__)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-PROFIT_RATES = {
-    ('1','2026-01'): 0.2879, ('1','2026-02'): 0.3413,
-    ('2','2026-01'): 0.4195, ('2','2026-02'): 0.3329,
-    ('3','2026-01'): 0.3286, ('3','2026-02'): 0.3738,
-    ('4','2026-01'): 0.2338, ('4','2026-02'): 0.2342,
-}
-
-def load_2025():
-    df = pd.read_csv(os.path.join(BASE_DIR, '2025_TIRE.csv'), sep=';', header=None)
-    df.columns = ['SaleDate','SaleMonth','SaleYear','BranchName','BranchID','InvoiceID','TotalSales','TotalCost','TotalProfit','ItemCount']
-    df['SaleDate'] = pd.to_datetime(df['SaleDate'])
-    df['TotalSales'] = pd.to_numeric(df['TotalSales'], errors='coerce').fillna(0) / 1.15
-    df['TotalCost'] = pd.to_numeric(df['TotalCost'], errors='coerce').fillna(0) / 1.15
-    df['TotalProfit'] = pd.to_numeric(df['TotalProfit'], errors='coerce').fillna(0) / 1.15
-    df['Month'] = df['SaleDate'].dt.strftime('%Y-%m')
-    df['branch_id'] = df['BranchName'].str.extract(r'(\d+)')
-    return df
-
-def load_2026_daily():
-    df = pd.read_excel(os.path.join(BASE_DIR, 'ج.xlsx'), header=2)
-    df = df[['الرقم','التاريخ','مبيعات فرع 1 | المجموع','مبيعات فرع 2 | المجموع','مبيعات فرع 3 | المجموع','مبيعات فرع 4 | المجموع']].copy()
-    df.columns = ['الرقم','التاريخ','ف1','ف2','ف3','ف4']
-    df = df[df['التاريخ'].notna()]
-    df['التاريخ'] = pd.to_datetime(df['التاريخ'], dayfirst=True, errors='coerce')
-    df = df[df['التاريخ'].notna()]
-    df = df[df['التاريخ'].dt.year == 2026]
-    for col in ['ف1','ف2','ف3','ف4']:
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-    rows = []
-    for _, row in df.iterrows():
-        date = row['التاريخ']
-        month = date.strftime('%Y-%m')
-        for branch, col in [('1','ف1'),('2','ف2'),('3','ف3'),('4','ف4')]:
-            sales = row[col] / 1.15
-            rate = PROFIT_RATES.get((branch, month), 0.30)
-            profit = sales * rate
-            cost = sales - profit
-            rows.append({'SaleDate': date, 'Month': month, 'branch_id': branch,
-                'BranchName': f'فرع {branch}', 'TotalSales': sales, 'TotalCost': cost, 'TotalProfit': profit})
-    return pd.DataFrame(rows)
+store = dataset.SnapshotStore(interval=float(os.environ.get('DASHBOARD_RELOAD_SECONDS', '10')))
+store.start()
+ALERT_RULES = alerting.load_rules()
+page_cache = PageCache(lambda: store.current.version, max_bytes=int(os.environ.get('DASHBOARD_PAGE_CACHE_MB', '64')) << 20)
+app.register_blueprint(api.create_api(store, ALERT_RULES))
+metrics.init_app(app)
 
-df25 = load_2025()
-df26 = load_2026_daily()
+def __getattr__(name):
+    # app.df25 و app.all_daily ... تشير دائماً إلى اللقطة الحالية
+    if name in ('df25', 'df26', 'all_daily', 'daily_index', 'monthly25', 'branches', 'min_date', 'max_date'):
+        return getattr(store.current, name)
+    raise AttributeError(name)
 
-# بيانات يومية كاملة
-daily25 = df25.groupby(['branch_id','BranchName','SaleDate']).agg(
-    sales=('TotalSales','sum'), cost=('TotalCost','sum'), profit=('TotalProfit','sum'), invoices=('InvoiceID','nunique')
-).reset_index()
-daily25['Month'] = daily25['SaleDate'].dt.strftime('%Y-%m')
+@app.route('/assets/plotly-<version>.min.js')
+def plotlyjs(version):
+    if version != charts.PLOTLYJS_VERSION:
+        abort(404)
+    bundle = charts.plotlyjs_bundle()
+    gz = 'gzip' in request.headers.get('Accept-Encoding', '')
+    resp = Response(bundle['gzip'] if gz else bundle['raw'], mimetype='application/javascript')
+    if gz:
+        resp.headers['Content-Encoding'] = 'gzip'
+    resp.headers['Vary'] = 'Accept-Encoding'
+    resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    resp.set_etag(bundle['etag'])
+    return resp.make_conditional(request)
 
-daily26 = df26.groupby(['branch_id','BranchName','SaleDate']).agg(
-    sales=('TotalSales','sum'), cost=('TotalCost','sum'), profit=('TotalProfit','sum')
-).reset_index()
-daily26['invoices'] = 0
-daily26['Month'] = daily26['SaleDate'].dt.strftime('%Y-%m')
+@app.route('/cache-stats')
+def cache_stats():
+    return jsonify(page_cache.stats())
 
-all_daily = pd.concat([daily25, daily26], ignore_index=True)
+@app.route('/metrics')
+def prometheus_metrics():
+    return metrics.render(store, page_cache)
 
-# ملخص شهري
-monthly25 = df25.groupby(['branch_id','Month','BranchName']).agg(
-    sales=('TotalSales','sum'), cost=('TotalCost','sum'),
-    profit=('TotalProfit','sum'), invoices=('InvoiceID','nunique')
-).reset_index()
-
-branches = sorted(all_daily['branch_id'].unique())
-min_date = all_daily['SaleDate'].min().strftime('%Y-%m-%d')
-max_date = all_daily['SaleDate'].max().strftime('%Y-%m-%d')
+def date_arg(name, default, empty=None):
+    """معامل تاريخ من الطلب كما هو: الغائب default، والفارغ empty (أو default)، وغير المفهوم 400."""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    if not value.strip():
+        return empty or default
+    try:
+        parse_date(value)
+    except ValueError:
+        abort(400)
+    return value
 
 @app.route('/')
+@metrics.profiled
+@page_cache.cached(params=('branch', 'date_from', 'date_to'))
 def dashboard():
+    timer = metrics.StageTimer()
+    data = store.current
     branch_filter = request.args.get('branch', 'all')
-    date_from = request.args.get('date_from', min_date)
-    date_to = request.args.get('date_to', max_date)
-
-    filtered = all_daily.copy()
-    filtered = filtered[(filtered['SaleDate'] >= date_from) & (filtered['SaleDate'] <= date_to)]
-    if branch_filter != 'all':
-        filtered = filtered[filtered['branch_id'] == branch_filter]
+    date_from = date_arg('date_from', data.min_date)
+    date_to = date_arg('date_to', data.max_date)
 
-    total_sales = filtered['sales'].sum()
-    total_cost = filtered['cost'].sum()
-    total_profit = filtered['profit'].sum()
-    total_invoices = filtered['invoices'].sum()
-    profit_pct = (total_profit / total_sales * 100) if total_sales > 0 else 0
+    totals, branch_summary, daily_agg = reports.dashboard_summary(data, branch_filter, date_from, date_to)
+    total_sales = totals['sales']
+    total_cost = totals['cost']
+    total_profit = totals['profit']
+    total_invoices = totals['invoices']
+    profit_pct = totals['profit_pct']
+    timer.lap('aggregate')
 
-    branch_summary = filtered.groupby(['branch_id','BranchName']).agg(
-        sales=('sales','sum'), cost=('cost','sum'), profit=('profit','sum')
-    ).reset_index()
-    branch_summary['profit_pct'] = (branch_summary['profit'] / branch_summary['sales'] * 100).round(1)
+    sales_labels = branch_summary['sales'].apply(lambda x: f'{x:,.0f}')
+    profit_labels = branch_summary['profit'].apply(lambda x: f'{x:,.0f}')
+    timer.lap('format')
 
     # مخطط الفروع
     fig = go.Figure()
     fig.add_trace(go.Bar(name='المبيعات', x=branch_summary['BranchName'], y=branch_summary['sales'],
-        marker_color='#3498db', text=branch_summary['sales'].apply(lambda x: f'{x:,.0f}'), textposition='outside'))
+        marker_color='#3498db', text=sales_labels, textposition='outside'))
     fig.add_trace(go.Bar(name='الأرباح', x=branch_summary['BranchName'], y=branch_summary['profit'],
-        marker_color='#2ecc71', text=branch_summary['profit'].apply(lambda x: f'{x:,.0f}'), textposition='outside'))
+        marker_color='#2ecc71', text=profit_labels, textposition='outside'))
     fig.update_layout(title='مقارنة المبيعات والأرباح بين الفروع', barmode='group',
         font=dict(family='Arial'), dragmode=False, hovermode=False, margin=dict(t=60,b=40))
-    graph1 = fig.to_html(full_html=False, config={'staticPlot': True, 'displayModeBar': False})
 
     # مخطط يومي
-    daily_agg = filtered.groupby('SaleDate').agg(sales=('sales','sum'), profit=('profit','sum')).reset_index()
     fig2 = go.Figure()
     fig2.add_trace(go.Bar(name='المبيعات', x=daily_agg['SaleDate'], y=daily_agg['sales'], marker_color='#3498db'))
     fig2.add_trace(go.Bar(name='الأرباح', x=daily_agg['SaleDate'], y=daily_agg['profit'], marker_color='#2ecc71'))
     fig2.update_layout(title='المبيعات اليومية', barmode='group',
         font=dict(family='Arial'), dragmode=False, hovermode=False, margin=dict(t=60,b=40))
-    graph2 = fig2.to_html(full_html=False, config={'staticPlot': True, 'displayModeBar': False})
+    timer.lap('figure')
+
+    graph1 = charts.chart_html(fig)
+    graph2 = charts.chart_html(fig2)
+    timer.lap('to_html')
 
     if not branch_summary.empty:
         b1 = branch_summary.loc[branch_summary['sales'].idxmax()]
@@ -127,10 +117,11 @@ def dashboard():
     else:
         analysis_html = ''
 
-    branch_opts = '<option value="all">كل الفروع</option>' + ''.join([f'<option value="{b}" {"selected" if branch_filter==b else ""}>فرع {b}</option>' for b in branches])
+    branch_opts = '<option value="all">كل الفروع</option>' + ''.join([f'<option value="{b}" {"selected" if branch_filter==b else ""}>فرع {b}</option>' for b in data.branches])
 
-    return f'''<!DOCTYPE html><html dir="rtl"><head><title>داشبورد محلات الكفرات</title>
+    page = f'''<!DOCTYPE html><html dir="rtl"><head><title>داشبورد محلات الكفرات</title>
     <meta name="viewport" content="width=device-width, initial-scale=1">
+    {charts.plotlyjs_tag()}
     <style>
         *{{box-sizing:border-box}}body{{font-family:Arial;margin:0;padding:15px;background:#f0f2f5}}
         h1{{color:#2c3e50;text-align:center;margin-bottom:10px;font-size:22px}}
@@ -176,29 +167,38 @@ def dashboard():
     <div class="chart">{graph1}</div>
     <div class="chart">{graph2}</div>
     </body></html>'''
+    timer.lap('html')
+    return page
 
 @app.route('/compare')
+@metrics.profiled
+@page_cache.cached(params=('date_from1', 'date_to1', 'date_from2', 'date_to2'))
 def compare():
-    date_from1 = request.args.get('date_from1', '2026-01-01')
-    date_to1 = request.args.get('date_to1', '2026-01-31')
-    date_from2 = request.args.get('date_from2', '2026-02-01')
-    date_to2 = request.args.get('date_to2', max_date)
+    timer = metrics.StageTimer()
+    data = store.current
+    date_from1 = date_arg('date_from1', reports.COMPARE_DEFAULTS[0], data.min_date)
+    date_to1 = date_arg('date_to1', reports.COMPARE_DEFAULTS[1], data.max_date)
+    date_from2 = date_arg('date_from2', reports.COMPARE_DEFAULTS[2], data.min_date)
+    date_to2 = date_arg('date_to2', data.max_date)
 
-    p1 = all_daily[(all_daily['SaleDate']>=date_from1)&(all_daily['SaleDate']<=date_to1)].groupby('branch_id').agg(sales=('sales','sum'),profit=('profit','sum')).reset_index()
-    p2 = all_daily[(all_daily['SaleDate']>=date_from2)&(all_daily['SaleDate']<=date_to2)].groupby('branch_id').agg(sales=('sales','sum'),profit=('profit','sum')).reset_index()
-    merged = p1.merge(p2, on='branch_id', suffixes=('_p1','_p2'))
-    merged['cs'] = ((merged['sales_p2']-merged['sales_p1'])/merged['sales_p1']*100).round(1)
-    merged['cp'] = ((merged['profit_p2']-merged['profit_p1'])/merged['profit_p1']*100).round(1)
-    merged['BranchName'] = 'فرع ' + merged['branch_id']
+    merged = reports.compare_periods(data, date_from1, date_to1, date_from2, date_to2)
+    timer.lap('aggregate')
+
+    p1_labels = merged['sales_p1'].apply(lambda x: f'{x:,.0f}')
+    p2_labels = merged['sales_p2'].apply(lambda x: f'{x:,.0f}')
+    timer.lap('format')
 
     fig = go.Figure()
     fig.add_trace(go.Bar(name=f'{date_from1}:{date_to1}', x=merged['BranchName'], y=merged['sales_p1'],
-        marker_color='#3498db', text=merged['sales_p1'].apply(lambda x: f'{x:,.0f}'), textposition='outside'))
+        marker_color='#3498db', text=p1_labels, textposition='outside'))
     fig.add_trace(go.Bar(name=f'{date_from2}:{date_to2}', x=merged['BranchName'], y=merged['sales_p2'],
-        marker_color='#e67e22', text=merged['sales_p2'].apply(lambda x: f'{x:,.0f}'), textposition='outside'))
+        marker_color='#e67e22', text=p2_labels, textposition='outside'))
     fig.update_layout(title='مقارنة المبيعات بين فترتين', barmode='group',
         font=dict(family='Arial'), dragmode=False, hovermode=False, margin=dict(t=60))
-    graph_html = fig.to_html(full_html=False, config={'staticPlot':True,'displayModeBar':False})
+    timer.lap('figure')
+
+    graph_html = charts.chart_html(fig)
+    timer.lap('to_html')
 
     rows = ''
     for _, row in merged.iterrows():
@@ -206,8 +206,9 @@ def compare():
         pc = '#2ecc71' if row['cp']>=0 else '#e74c3c'
         rows += f'<tr><td>فرع {row["branch_id"]}</td><td>{row["sales_p1"]:,.0f}</td><td>{row["sales_p2"]:,.0f}</td><td style="color:{sc};font-weight:bold;">{"↑" if row["cs"]>=0 else "↓"} {abs(row["cs"])}%</td><td>{row["profit_p1"]:,.0f}</td><td>{row["profit_p2"]:,.0f}</td><td style="color:{pc};font-weight:bold;">{"↑" if row["cp"]>=0 else "↓"} {abs(row["cp"])}%</td></tr>'
 
-    return f'''<!DOCTYPE html><html dir="rtl"><head><title>مقارنة الفترات</title>
+    page = f'''<!DOCTYPE html><html dir="rtl"><head><title>مقارنة الفترات</title>
     <meta name="viewport" content="width=device-width, initial-scale=1">
+    {charts.plotlyjs_tag()}
     <style>body{{font-family:Arial;margin:0;padding:15px;background:#f0f2f5}}h1{{color:#2c3e50;text-align:center}}
     .nav{{text-align:center;margin:12px 0}}.nav a{{background:#3498db;color:white;padding:9px 18px;border-radius:6px;text-decoration:none;font-weight:bold}}
     .filters{{background:white;padding:12px;border-radius:10px;margin:12px 0;display:flex;gap:10px;align-items:center;flex-wrap:wrap;box-shadow:0 2px 5px rgba(0,0,0,.1)}}
@@ -232,38 +233,44 @@ def compare():
     <div class="chart">{graph_html}</div>
     <table><tr><th>الفرع</th><th>مبيعات الفترة 1</th><th>مبيعات الفترة 2</th><th>تغيير المبيعات</th><th>ربح الفترة 1</th><th>ربح الفترة 2</th><th>تغيير الربح</th></tr>{rows}</table>
     </body></html>'''
+    timer.lap('html')
+    return page
+
+# نص كل قاعدة، أو نص خاص بمستوى منها
+ALERT_TEXT = {
+    'sales_change': 'انخفضت المبيعات بنسبة <strong>{value}%</strong> مقارنة بالأسبوع السابق',
+    'profit_change': 'انخفض الربح بنسبة <strong>{value}%</strong> مقارنة بالأسبوع السابق',
+    ('margin', 'red'): 'نسبة الربح منخفضة جداً: <strong>{value}%</strong>',
+    'margin': 'نسبة الربح أقل من المعتاد: <strong>{value}%</strong>',
+}
+ALERT_ICONS = {'red': '🔴', 'orange': '🟡'}
 
 @app.route('/alerts')
+@metrics.profiled
+@page_cache.cached(params=('date', 'branch'))
 def alerts():
-    last7_to = max_date
-    last7_from = (pd.to_datetime(max_date) - pd.Timedelta(days=6)).strftime('%Y-%m-%d')
-    prev7_to = (pd.to_datetime(last7_from) - pd.Timedelta(days=1)).strftime('%Y-%m-%d')
-    prev7_from = (pd.to_datetime(prev7_to) - pd.Timedelta(days=6)).strftime('%Y-%m-%d')
-
-    last = all_daily[(all_daily['SaleDate']>=last7_from)&(all_daily['SaleDate']<=last7_to)].groupby('branch_id').agg(sales=('sales','sum'),profit=('profit','sum')).reset_index()
-    prev = all_daily[(all_daily['SaleDate']>=prev7_from)&(all_daily['SaleDate']<=prev7_to)].groupby('branch_id').agg(sales=('sales','sum'),profit=('profit','sum')).reset_index()
-    merged = last.merge(prev, on='branch_id', suffixes=('_l','_p'), how='left')
-    merged['pp'] = (merged['profit_l']/merged['sales_l']*100).round(1)
-    merged['sc'] = ((merged['sales_l']-merged['sales_p'])/merged['sales_p']*100).round(1)
-    merged['pc'] = ((merged['profit_l']-merged['profit_p'])/merged['profit_p']*100).round(1)
+    timer = metrics.StageTimer()
+    data = store.current
+    branch = request.args.get('branch', 'all')
+    try:
+        day = parse_date(request.args.get('date', data.max_date))
+        data.alerts.position(day)
+    except ValueError:
+        abort(400)
+    events = data.alerts.events(day, day, branch, ALERT_RULES)
+    last7_to = day.strftime('%Y-%m-%d')
+    last7_from = (day - pd.Timedelta(days=6)).strftime('%Y-%m-%d')
+    timer.lap('aggregate')
 
     alerts_html = ''
-    for _, row in merged.iterrows():
-        bn = f'فرع {row["branch_id"]}'
-        if row['sc'] < -20:
-            alerts_html += f'<div class="alert red">🔴 <strong>{bn}</strong> — انخفضت المبيعات بنسبة <strong>{abs(row["sc"])}%</strong> مقارنة بالأسبوع السابق</div>'
-        elif row['sc'] < 0:
-            alerts_html += f'<div class="alert orange">🟡 <strong>{bn}</strong> — انخفضت المبيعات بنسبة <strong>{abs(row["sc"])}%</strong> مقارنة بالأسبوع السابق</div>'
-        if row['pc'] < -20:
-            alerts_html += f'<div class="alert red">🔴 <strong>{bn}</strong> — انخفض الربح بنسبة <strong>{abs(row["pc"])}%</strong> مقارنة بالأسبوع السابق</div>'
-        if row['pp'] < 10:
-            alerts_html += f'<div class="alert red">🔴 <strong>{bn}</strong> — نسبة الربح منخفضة جداً: <strong>{row["pp"]}%</strong></div>'
-        elif row['pp'] < 20:
-            alerts_html += f'<div class="alert orange">🟡 <strong>{bn}</strong> — نسبة الربح أقل من المعتاد: <strong>{row["pp"]}%</strong></div>'
+    for row in events.itertuples(index=False):
+        text = ALERT_TEXT.get((row.rule, row.level)) or ALERT_TEXT[row.rule]
+        value = abs(row.value) if row.rule.endswith('_change') else row.value
+        alerts_html += f'<div class="alert {row.level}">{ALERT_ICONS.get(row.level, "")} <strong>فرع {row.branch_id}</strong> — {text.format(value=value)}</div>'
     if not alerts_html:
         alerts_html = '<div class="alert green">✅ لا توجد تنبيهات — كل الفروع تعمل بشكل طبيعي</div>'
 
-    return f'''<!DOCTYPE html><html dir="rtl"><head><title>التنبيهات</title>
+    page = f'''<!DOCTYPE html><html dir="rtl"><head><title>التنبيهات</title>
     <meta name="viewport" content="width=device-width, initial-scale=1">
     <style>body{{font-family:Arial;margin:0;padding:15px;background:#f0f2f5}}h1{{color:#2c3e50;text-align:center}}
     .subtitle{{text-align:center;color:#7f8c8d;margin-bottom:15px}}
@@ -275,23 +282,48 @@ def alerts():
     <h1>⚠️ التنبيهات</h1>
     <div class="subtitle">آخر 7 أيام ({last7_from} إلى {last7_to}) مقابل الأسبوع السابق</div>
     <div class="nav"><a href="/">← العودة</a></div><br>{alerts_html}</body></html>'''
+    timer.lap('html')
+    return page
 
 @app.route('/predictions')
+@metrics.profiled
+@page_cache.cached(params=('horizon',))
 def predictions():
-    avg25 = monthly25.groupby('branch_id').agg(avg_sales=('sales','mean'),avg_profit=('profit','mean')).reset_index()
+    timer = metrics.StageTimer()
+    data = store.current
+    horizon = request.args.get('horizon', 7, type=int)
+    try:
+        forecast = data.forecast.totals(horizon)[['branch_id','forecast','lower','upper']]
+    except ValueError:
+        abort(400)
+    timer.lap('forecast')
+    avg25 = data.monthly25.groupby('branch_id').agg(avg_sales=('sales','mean'),avg_profit=('profit','mean')).reset_index()
     avg25['avg_profit_pct'] = (avg25['avg_profit']/avg25['avg_sales']*100).round(1)
-    avg25['avg_weekly'] = (avg25['avg_sales']/4).round(0)
-    last7_from = (pd.to_datetime(max_date) - pd.Timedelta(days=6)).strftime('%Y-%m-%d')
-    last_data = all_daily[all_daily['SaleDate']>=last7_from].groupby('branch_id').agg(last_sales=('sales','sum')).reset_index()
-    fc = avg25.merge(last_data, on='branch_id', how='left')
+    last7_from = (pd.to_datetime(data.max_date) - pd.Timedelta(days=6)).strftime('%Y-%m-%d')
+    last_data = data.daily_index.totals(last7_from, data.max_date)[['branch_id','sales']].rename(columns={'sales': 'last_sales'})
+    # كل فرع له توقع، ومتوسطات 2025 لمن له بيانات فيها
+    fc = forecast.merge(avg25, on='branch_id', how='left').merge(last_data, on='branch_id', how='left')
     fc['last_sales'] = fc['last_sales'].fillna(0)
-    fc['trend'] = ((fc['last_sales']-fc['avg_weekly'])/fc['avg_weekly']*100).round(1)
-    best = fc.loc[fc['avg_sales'].idxmax(),'branch_id']
+    # التوقع بمعدل أسبوعي مقابل آخر 7 أيام؛ بلا مبيعات في آخر 7 أيام لا اتجاه
+    last_sales = fc['last_sales'].where(fc['last_sales'] > 0)
+    fc['trend'] = ((fc['forecast']*7/horizon-last_sales)/last_sales*100).round(1)
+    best = f'فرع {fc.loc[fc["forecast"].idxmax(),"branch_id"]}' if len(fc) else '—'
+    period = 'الأسبوع' if horizon == 7 else f'{horizon} يوماً'
+    upcoming = 'الأسبوع القادم' if horizon == 7 else f'{horizon} يوماً القادمة'
+    timer.lap('aggregate')
     rows = ''
     for _, row in fc.iterrows():
-        tc = '#2ecc71' if row['trend']>=0 else '#e74c3c'
-        rows += f'<tr><td>فرع {row["branch_id"]}</td><td>{row["avg_sales"]:,.0f}</td><td>{row["avg_profit"]:,.0f}</td><td>{row["avg_profit_pct"]}%</td><td>{row["avg_weekly"]:,.0f}</td><td>{row["last_sales"]:,.0f}</td><td style="color:{tc};font-weight:bold;">{"↑" if row["trend"]>=0 else "↓"} {abs(row["trend"])}%</td></tr>'
-    return f'''<!DOCTYPE html><html dir="rtl"><head><title>التوقعات</title>
+        if pd.isna(row['avg_sales']):
+            avg = '<td>—</td><td>—</td><td>—</td>'
+        else:
+            avg = f'<td>{row["avg_sales"]:,.0f}</td><td>{row["avg_profit"]:,.0f}</td><td>{row["avg_profit_pct"]}%</td>'
+        if pd.isna(row['trend']):
+            trend = '<td>—</td>'
+        else:
+            tc = '#2ecc71' if row['trend']>=0 else '#e74c3c'
+            trend = f'<td style="color:{tc};font-weight:bold;">{"↑" if row["trend"]>=0 else "↓"} {abs(row["trend"])}%</td>'
+        rows += f'<tr><td>فرع {row["branch_id"]}</td>{avg}<td>{row["forecast"]:,.0f}</td><td>{row["lower"]:,.0f} – {row["upper"]:,.0f}</td><td>{row["last_sales"]:,.0f}</td>{trend}</tr>'
+    page = f'''<!DOCTYPE html><html dir="rtl"><head><title>التوقعات</title>
     <meta name="viewport" content="width=device-width, initial-scale=1">
     <style>body{{font-family:Arial;margin:0;padding:15px;background:#f0f2f5}}h1{{color:#2c3e50;text-align:center}}
     .nav{{text-align:center;margin:12px 0}}.nav a{{background:#3498db;color:white;padding:9px 18px;border-radius:6px;text-decoration:none;font-weight:bold}}
@@ -303,11 +335,13 @@ def predictions():
     <h1>🔮 التوقعات</h1>
     <div class="nav"><a href="/">← العودة</a></div>
     <div class="st">الفرع المتوقع الأعلى مبيعات</div>
-    <div class="hl">🏆 بناءً على أداء 2025 — الفرع المتوقع: <strong>فرع {best}</strong></div>
+    <div class="hl">🏆 بناءً على توقع {upcoming} — الفرع المتوقع: <strong>{best}</strong></div>
     <div class="st">توقعات المبيعات لكل فرع</div>
-    <table><tr><th>الفرع</th><th>متوسط المبيعات (2025)</th><th>متوسط الربح (2025)</th><th>نسبة الربح</th><th>توقع الأسبوع</th><th>مبيعات آخر 7 أيام</th><th>الاتجاه</th></tr>{rows}</table>
-    <p class="note">* التوقعات مبنية على متوسط أداء 2025</p>
+    <table><tr><th>الفرع</th><th>متوسط المبيعات (2025)</th><th>متوسط الربح (2025)</th><th>نسبة الربح</th><th>توقع {period}</th><th>نطاق التوقع (80%)</th><th>مبيعات آخر 7 أيام</th><th>الاتجاه</th></tr>{rows}</table>
+    <p class="note">* التوقع: متوسط مبيعات الفرع في آخر 28 يوماً (أو منذ آخر تغير واضح في مستواه إن كان أقرب) × موسمية أيام الأسبوع والأشهر المقدرة من كل البيانات اليومية</p>
     </body></html>'''
+    timer.lap('html')
+    return page
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
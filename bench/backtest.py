@@ -0,0 +1,139 @@
+"""دقة توقعات forecast.py على كل البيانات اليومية، وزمن التقدير مع ازدياد عدد الفروع.
+
+    python bench/backtest.py [--horizons 7 28] [--step 1] [--branches 4 40 400 4000] [--out results.json]
+
+1. اختبار رجعي على all_daily (2025 و2026): من كل نقطة بدء (كل --step يوم بعد
+   MIN_HISTORY يوماً) يُقدر النموذج على ما قبلها فقط ويُقارن مجموع الأفق بالفعلي:
+   WAPE للمجموع ولكل يوم، وتغطية نطاق 80%، لنقاط البدء في كل سنة وللكل. للمقارنة:
+   الطريقة القديمة (متوسط الشهر / 4)، متوسط آخر 28 يوماً، وتكرار آخر أسبوع. لا يدخل
+   فرع نقطة بدء إلا وله بيانات في كل الأيام الـ 28 قبلها.
+2. التوسع: شبكات يومية اصطناعية (bench/synth.py) لسنتين بعدد فروع متزايد؛ زمن
+   التقدير لكل الفروع دفعة واحدة مقابل حلقة على الفروع، ودقة آخر 28 يوماً.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import forecast  # noqa: E402
+
+MIN_HISTORY = 90
+STEP = 1
+LOOP_MAX_BRANCHES = 400
+
+
+def backtest(days, y, mask, horizon, step=STEP, level=forecast.LEVEL):
+    """أخطاء النموذج والطرق البسيطة من نقاط بدء متتالية لكل سنة وللكل؛ WAPE = Σ|خطأ| / Σ فعلي."""
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    periods = {}
+    for origin in range(MIN_HISTORY, len(days) - horizon + 1, step):
+        ready = mask[:, origin - 28:origin].all(axis=1)
+        if not ready.any():
+            continue
+        start = time.perf_counter()
+        params = forecast.fit(days[:origin], y[:, :origin], mask[:, :origin])
+        seconds = time.perf_counter() - start
+        _, mean, var = forecast.predict(params, days[origin:origin + horizon])
+        actual = y[:, origin:origin + horizon]
+        total = actual.sum(axis=1)
+        predicted = mean.sum(axis=1)
+        sd = forecast.total_sd(params, mean, var)
+        # الطريقة القديمة في /predictions: متوسط المبيعات الشهرية / 4 لكل أسبوع
+        months = pd.Series(days[:origin]).dt.to_period('M').to_numpy()
+        monthly = pd.DataFrame(y[:, :origin].T).groupby(months).sum()
+        week = y[:, origin - 7:origin]
+        err = {'model': np.abs(predicted - total),
+               'model_daily': np.abs(mean - actual).sum(axis=1),
+               'monthly_mean': np.abs(monthly.mean().to_numpy() / 4 * horizon / 7 - total),
+               'last_28_mean': np.abs(y[:, origin - 28:origin].mean(axis=1) * horizon - total),
+               'last_week': np.abs(np.tile(week, (1, -(-horizon // 7)))[:, :horizon].sum(axis=1) - total)}
+        for period in (str(days[origin].astype('datetime64[Y]')), 'all'):
+            acc = periods.setdefault(period, {'actual': 0.0, 'covered': 0, 'count': 0, 'fit': [], **dict.fromkeys(err, 0.0)})
+            for k, v in err.items():
+                acc[k] += v[ready].sum()
+            acc['actual'] += total[ready].sum()
+            acc['covered'] += (np.abs(predicted - total) <= z * sd)[ready].sum()
+            acc['count'] += ready.sum()
+            acc['fit'].append(seconds)
+    out = {}
+    for period, acc in periods.items():
+        r = {k: acc[k] / acc['actual'] for k in err}
+        r.update({'origins': len(acc['fit']), 'coverage': acc['covered'] / acc['count'],
+                  'fit_ms': np.median(acc['fit']) * 1000})
+        out[period] = r
+    return out
+
+
+def load_daily():
+    """شبكة (فرع × يوم) من all_daily في لقطة التطبيق نفسها (2025 و2026)."""
+    import dataset
+    return forecast.calendar(dataset.build_snapshot().daily_index)
+
+
+def synthetic(branches, seed, years=2):
+    import synth
+    dates = pd.date_range(f'{synth.LAST_YEAR - years + 1}-01-01', f'{synth.LAST_YEAR}-12-31', freq='D')
+    y = synth.daily_totals(np.random.default_rng(seed), branches, dates).T
+    return dates.to_numpy(), y, np.ones(y.shape, dtype=bool)
+
+
+def scale(branches, seed, horizon=28):
+    days, y, mask = synthetic(branches, seed)
+    train = len(days) - horizon
+    start = time.perf_counter()
+    params = forecast.fit(days[:train], y[:, :train], mask[:, :train])
+    batch = time.perf_counter() - start
+    out = {'branches': branches, 'days': train, 'fit_ms': batch * 1000}
+    if branches <= LOOP_MAX_BRANCHES:
+        start = time.perf_counter()
+        for b in range(branches):
+            forecast.fit(days[:train], y[b:b + 1, :train], mask[b:b + 1, :train])
+        out['loop_ms'] = (time.perf_counter() - start) * 1000
+    _, mean, _ = forecast.predict(params, days[train:])
+    actual = y[:, train:]
+    out['wape'] = np.abs(mean.sum(axis=1) - actual.sum(axis=1)).sum() / actual.sum()
+    out['wape_daily'] = np.abs(mean - actual).sum() / actual.sum()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--horizons', type=int, nargs='+', default=[7, 28])
+    parser.add_argument('--step', type=int, default=STEP)
+    parser.add_argument('--branches', type=int, nargs='+', default=[4, 40, 400, 4000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out')
+    args = parser.parse_args()
+
+    days, y, mask = load_daily()
+    report = {'backtest': {}, 'scale': []}
+    print(f'backtest all_daily: {y.shape[0]} branches, {len(days)} days, origins every {args.step} days after {MIN_HISTORY}\n')
+    print(f'{"horizon":<9}{"origins":<9}{"model":>8}{"daily":>8}{"monthly/4":>11}{"last 28":>9}{"last wk":>9}{"cover":>8}{"fit ms":>8}')
+    for h in args.horizons:
+        report['backtest'][h] = backtest(days, y, mask, h, args.step)
+        for period, r in sorted(report['backtest'][h].items()):
+            print(f'{h:<9}{period:<9}{r["model"]:>8.3f}{r["model_daily"]:>8.3f}{r["monthly_mean"]:>11.3f}{r["last_28_mean"]:>9.3f}'
+                  f'{r["last_week"]:>9.3f}{r["coverage"]:>8.2f}{r["fit_ms"]:>8.2f}')
+
+    print(f'\nsynthetic, 2 years, 28-day holdout\n\n{"branches":<10}{"fit ms":>10}{"loop ms":>10}{"wape":>8}{"daily":>8}')
+    for b in args.branches:
+        r = scale(b, args.seed)
+        report['scale'].append(r)
+        loop = f'{r["loop_ms"]:>10.1f}' if 'loop_ms' in r else f'{"-":>10}'
+        print(f'{b:<10}{r["fit_ms"]:>10.1f}{loop}{r["wape"]:>8.3f}{r["wape_daily"]:>8.3f}')
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=float)
+
+
+if __name__ == '__main__':
+    main()
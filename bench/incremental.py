@@ -0,0 +1,57 @@
+"""يتحقق أن بناء AlertTimeline تدريجياً (من خط اللقطة السابقة) يطابق بناءه من الصفر.
+
+    python bench/incremental.py
+
+الحالات: إضافة أيام، إضافة بعد فجوة، تعديل يوم في الوسط أو حذفه، حذف آخر الأيام، فرع جديد.
+يطبع عدد الأيام المعاد حسابها لكل حالة، ويخرج برمز 1 عند أي اختلاف.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dataset  # noqa: E402
+from alerting import AlertTimeline  # noqa: E402
+from rangeindex import DailyIndex  # noqa: E402
+
+
+def scenarios(daily):
+    days = np.sort(daily['SaleDate'].unique())
+    before = lambda n: daily[daily['SaleDate'] < days[-n]]  # noqa: E731
+    edited = daily.copy()
+    middle = edited.index[edited['SaleDate'] == days[len(days) // 2]]
+    edited.loc[middle, 'sales'] *= 1.5
+    branch = daily[daily['branch_id'] == daily['branch_id'].iloc[0]].assign(branch_id='99', BranchName='فرع 99')
+    return {
+        'append': (before(5), daily),
+        'gap': (before(10), pd.concat([before(10), daily[daily['SaleDate'] >= days[-3]]])),
+        'edit middle': (daily, edited),
+        'remove middle': (daily, daily[daily['SaleDate'] != days[len(days) // 2]]),
+        'truncate 1': (daily, before(1)),
+        'truncate 5': (daily, before(5)),
+        'new branch': (daily, pd.concat([daily, branch])),
+        'unchanged': (daily, daily),
+    }
+
+
+def main():
+    daily = dataset.build_snapshot().all_daily
+    failed = False
+    print(f'{"case":<14}{"days":>6}{"recomputed":>12}  result')
+    for name, (old, new) in scenarios(daily).items():
+        index = DailyIndex(new)
+        fresh = AlertTimeline(index)
+        inc = AlertTimeline(index, AlertTimeline(DailyIndex(old)))
+        ok = np.array_equal(inc.days, fresh.days) and 0 <= inc.recomputed_days <= len(fresh.days) \
+            and inc.values.keys() == fresh.values.keys() \
+            and all(np.array_equal(inc.values[k], fresh.values[k], equal_nan=True) for k in fresh.values)
+        failed |= not ok
+        print(f'{name:<14}{len(fresh.days):>6}{inc.recomputed_days:>12}  {"ok" if ok else "MISMATCH"}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""حجم الصفحة وزمن التوليد لـ / و /compare قبل وبعد خدمة plotly.js كملف ثابت.
+
+    python bench/pages.py [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# كاش الصفحات لا يعرف وضع plotly.js؛ بدونه يُقاس التوليد الفعلي لكل وضع
+os.environ['DASHBOARD_PAGE_CACHE_MB'] = '0'
+
+import app  # noqa: E402
+import charts  # noqa: E402
+
+ROUTES = ['/', '/compare']
+
+
+def measure(client, url, repeat):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        resp = client.get(url)
+        times.append((time.perf_counter() - t) * 1000)
+    return len(resp.data), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    client = app.app.test_client()
+    asset = len(charts.plotlyjs_bundle()['gzip'])
+    print(f'{"route":<10}{"mode":<8}{"bytes":>12}{"ms (p50)":>10}')
+    for url in ROUTES:
+        for mode in ('inline', 'static'):
+            charts.PLOTLYJS_MODE = mode
+            client.get(url)
+            size, ms = measure(client, url, args.repeat)
+            print(f'{url:<10}{mode:<8}{size:>12,}{ms:>10.1f}')
+    print(f'\nplotly.js {charts.PLOTLYJS_VERSION} ({charts.PLOTLYJS_URL}): '
+          f'{asset:,} bytes gzip, downloaded once then cached')
+
+
+if __name__ == '__main__':
+    main()
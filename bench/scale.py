@@ -0,0 +1,159 @@
+"""زمن الإقلاع والذاكرة وزمن الاستجابة على بيانات اصطناعية بأحجام مختلفة.
+
+    python bench/scale.py [--scale 1x 10x 100x] [--requests 50] [--out results.json] [--baseline old.json]
+
+لكل حجم: تُولد البيانات (bench/synth.py) ثم يُشغل التطبيق في عملية جديدة مرتين:
+باردة (بلا لقطات colstore) ودافئة (من اللقطات). في الدافئة تُقاس p50/p95/p99
+لـ / و /compare و /alerts و /predictions عبر test client، وكاش الصفحات معطل
+حتى يُقاس التوليد الفعلي. النتائج JSON للمقارنة بين النسخ.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE_ROWS = 16643
+
+# الحجم الحالي: 4 فروع وسنة واحدة
+SCALES = {
+    '1x': {'rows': BASE_ROWS, 'branches': 4, 'years': 1},
+    '10x': {'rows': BASE_ROWS * 10, 'branches': 12, 'years': 2},
+    '100x': {'rows': BASE_ROWS * 100, 'branches': 40, 'years': 3},
+    '1000x': {'rows': BASE_ROWS * 1000, 'branches': 100, 'years': 5},
+}
+ROUTES = ['/', '/compare', '/alerts', '/predictions']
+
+
+def _child(requests, seed):
+    """يعمل داخل العملية الجديدة: يقيس import app ثم زمن كل مسار."""
+    import resource
+    start = time.perf_counter()
+    import app
+    startup = time.perf_counter() - start
+    out = {'startup_s': startup, 'rss_after_import_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+    if requests:
+        import random
+        import numpy as np
+        import pandas as pd
+        rnd = random.Random(seed)
+        days = pd.date_range(app.min_date, app.max_date).strftime('%Y-%m-%d')
+        branches = ['all'] + list(app.branches)
+
+        def span():
+            a, b = sorted(rnd.sample(range(len(days)), 2))
+            return days[a], days[b]
+
+        def url(route):
+            if route == '/':
+                f, t = span()
+                return f'/?branch={rnd.choice(branches)}&date_from={f}&date_to={t}'
+            if route == '/compare':
+                (f1, t1), (f2, t2) = span(), span()
+                return f'/compare?date_from1={f1}&date_to1={t1}&date_from2={f2}&date_to2={t2}'
+            return route
+
+        client = app.app.test_client()
+        out['routes'] = {}
+        for route in ROUTES:
+            client.get(url(route))
+            times = []
+            for _ in range(requests):
+                u = url(route)
+                t = time.perf_counter()
+                resp = client.get(u)
+                times.append((time.perf_counter() - t) * 1000)
+                assert resp.status_code == 200, (u, resp.status_code)
+            p50, p95, p99 = np.percentile(times, [50, 95, 99])
+            out['routes'][route] = {'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'bytes': len(resp.data)}
+    out['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps(out))
+
+
+def _run_child(data_dir, requests, seed):
+    env = dict(os.environ, DASHBOARD_DATA_DIR=data_dir, DASHBOARD_CACHE_DIR=os.path.join(data_dir, '.cache'),
+               DASHBOARD_RELOAD_SECONDS='0', DASHBOARD_PAGE_CACHE_MB='0')
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', str(requests), '--seed', str(seed)],
+                          cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_scale(name, requests, seed, work_dir):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import synth
+    params = SCALES[name]
+    data_dir = os.path.join(work_dir, name)
+    start = time.perf_counter()
+    paths = synth.generate(data_dir, seed=seed, **params)
+    result = {'scale': name, **params, 'generate_s': time.perf_counter() - start,
+              'bytes': {k: os.path.getsize(p) for k, p in paths.items()}}
+    result['cold'] = _run_child(data_dir, 0, seed)
+    result['warm'] = _run_child(data_dir, requests, seed)
+    return result
+
+
+def _git_rev():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print(results, baseline):
+    base = {r['scale']: r for r in (baseline or {}).get('results', [])}
+    print(f'{"scale":<7}{"metric":<22}{"value":>12}{"baseline":>12}{"ratio":>8}')
+
+    def line(scale, metric, value, old):
+        ratio = f'{value / old:>8.2f}' if old else ''
+        old = f'{old:>12.1f}' if old is not None else ''
+        print(f'{scale:<7}{metric:<22}{value:>12.1f}{old:>12}{ratio}')
+
+    for r in results:
+        b = base.get(r['scale'], {})
+        for phase in ('cold', 'warm'):
+            line(r['scale'], f'{phase} startup ms', r[phase]['startup_s'] * 1000,
+                 b.get(phase, {}).get('startup_s', 0) * 1000 or None)
+            line(r['scale'], f'{phase} peak rss MB', r[phase]['peak_rss_mb'], b.get(phase, {}).get('peak_rss_mb'))
+        for route, q in r['warm']['routes'].items():
+            for p in ('p50_ms', 'p95_ms', 'p99_ms'):
+                old = b.get('warm', {}).get('routes', {}).get(route, {}).get(p)
+                line(r['scale'], f'{route} {p}', q[p], old)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', nargs='+', default=['1x', '10x', '100x'], choices=list(SCALES))
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out')
+    parser.add_argument('--baseline')
+    parser.add_argument('--work-dir')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        sys.path.insert(0, ROOT)
+        return _child(args.child, args.seed)
+
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as work_dir:
+        results = [run_scale(name, args.requests, args.seed, work_dir) for name in args.scale]
+    report = {'meta': {'git': _git_rev(), 'python': platform.python_version(), 'machine': platform.machine(),
+                       'cpus': os.cpu_count(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       'requests': args.requests, 'seed': args.seed},
+              'results': results}
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+    _print(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
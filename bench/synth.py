@@ -0,0 +1,123 @@
+"""مولد بيانات اصطناعية بنفس صيغ 2025_TIRE.csv و ج.xlsx و profit_rates.csv.
+
+    python bench/synth.py OUT_DIR [--rows N] [--branches N] [--years N] [--days N] [--seed N]
+
+نفس البذرة ونفس المعاملات تعطي نفس الملفات تماماً.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+CSV_CHUNK_ROWS = 500_000
+LAST_YEAR = 2025
+DAILY_YEAR = 2026
+# موسمية تقريبية: الجمعة أضعف، نهاية الأسبوع والصيف أقوى
+WEEKDAY_WEIGHT = np.array([1.0, 1.0, 1.05, 1.1, 0.6, 1.2, 1.15])
+MONTH_WEIGHT = np.array([0.9, 0.85, 0.95, 1.0, 1.05, 1.15, 1.2, 1.15, 1.0, 0.95, 0.9, 1.0])
+
+
+def _branch_weights(rng, branches):
+    w = 1 / np.arange(1, branches + 1) ** 0.8
+    return rng.permutation(w / w.sum())
+
+
+def _day_weights(days):
+    w = WEEKDAY_WEIGHT[days.dayofweek] * MONTH_WEIGHT[days.month - 1]
+    return w / w.sum()
+
+
+def _hex(rng, n, width):
+    return pd.Series(rng.integers(0, 16 ** width, size=n, dtype=np.int64)).map(f'{{:0{width}X}}'.format)
+
+
+def write_invoices(path, rng, rows, branches, years):
+    days = pd.date_range(f'{LAST_YEAR - years + 1}-01-01', f'{LAST_YEAR}-12-31', freq='D')
+    day_w = _day_weights(days)
+    branch_w = _branch_weights(rng, branches)
+    branch_guid = [f'{g[:8]}-{g[8:12]}-{g[12:]}' for g in _hex(rng, branches, 15)]
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        # الأيام مرتبة كما في الملف الحقيقي الذي يُضاف إليه يومياً
+        counts = rng.multinomial(rows, day_w)
+        day_idx = np.repeat(np.arange(len(days)), counts)
+        for start in range(0, rows, CSV_CHUNK_ROWS):
+            d = days[day_idx[start:start + CSV_CHUNK_ROWS]]
+            n = len(d)
+            b = rng.choice(branches, size=n, p=branch_w)
+            sales = np.round(rng.lognormal(6.6, 0.9, size=n), 2)
+            cost = np.round(sales * rng.uniform(0.55, 0.9, size=n), 2)
+            chunk = pd.DataFrame({
+                'SaleDate': d.strftime('%Y-%m-%d'), 'SaleMonth': d.month, 'SaleYear': d.year,
+                'BranchName': [f'فرع {i + 1}' for i in b], 'BranchID': [branch_guid[i] for i in b],
+                'InvoiceID': _hex(rng, n, 15) + _hex(rng, n, 15),
+                'TotalSales': sales, 'TotalCost': cost, 'TotalProfit': np.round(sales - cost, 2),
+                'ItemCount': rng.integers(1, 5, size=n),
+            })
+            chunk.to_csv(f, sep=';', header=False, index=False, lineterminator='\n')
+
+
+def daily_totals(rng, branches, dates):
+    """مبيعات (يوم × فرع) بموسمية WEEKDAY_WEIGHT و MONTH_WEIGHT وضجيج log-normal."""
+    branch_w = _branch_weights(rng, branches)
+    base = 120_000 * branch_w[None, :] * (WEEKDAY_WEIGHT[dates.dayofweek] * MONTH_WEIGHT[dates.month - 1])[:, None]
+    return np.round(base * rng.lognormal(0, 0.25, size=base.shape), 2)
+
+
+def write_daily(path, rng, branches, days):
+    dates = pd.date_range(f'{DAILY_YEAR}-01-01', periods=days, freq='D')
+    totals = daily_totals(rng, branches, dates)
+    qty = np.maximum((totals / 450).astype(int), 0)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Sheet1')
+    ws.append(['ملخص الحركة اليومية'])
+    ws.append([f'اعتباراً من  {dates[0]:%d/%m/%Y}  إلى تاريخ  {dates[-1]:%d/%m/%Y}', 'الفترة:يومي', 'العملات:ريال سعودي'])
+    header = ['الرقم', 'التاريخ']
+    for b in range(1, branches + 1):
+        header += [f'مبيعات فرع {b} | الكمية', f'مبيعات فرع {b} | المجموع']
+    ws.append(header + ['المجموع | الكمية', 'المجموع | المجموع', 'رصيد الحركة | الكمية', 'رصيد الحركة | المجموع'])
+    for i, date in enumerate(dates):
+        row = [i + 1, date.to_pydatetime()]
+        for b in range(branches):
+            row += [int(qty[i, b]), float(totals[i, b])]
+        q, t = int(qty[i].sum()), float(totals[i].sum().round(2))
+        ws.append(row + [q, t, -q, -t])
+    wb.save(path)
+
+
+def write_rates(path, rng, branches, days):
+    months = pd.date_range(f'{DAILY_YEAR}-01-01', periods=days, freq='D').strftime('%Y-%m').unique()
+    rates = pd.DataFrame([(b, m, round(rng.uniform(0.2, 0.45), 4))
+                          for b in range(1, branches + 1) for m in months], columns=['branch_id', 'Month', 'rate'])
+    rates.to_csv(path, sep=';', index=False)
+
+
+def generate(out_dir, rows=16643, branches=4, years=1, days=58, seed=0):
+    """يكتب الملفات الثلاثة في out_dir ويعيد مساراتها."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = {'invoices': os.path.join(out_dir, '2025_TIRE.csv'),
+             'daily': os.path.join(out_dir, 'ج.xlsx'),
+             'rates': os.path.join(out_dir, 'profit_rates.csv')}
+    write_invoices(paths['invoices'], rng, rows, branches, years)
+    write_daily(paths['daily'], rng, branches, days)
+    write_rates(paths['rates'], rng, branches, days)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('out_dir')
+    parser.add_argument('--rows', type=int, default=16643)
+    parser.add_argument('--branches', type=int, default=4)
+    parser.add_argument('--years', type=int, default=1)
+    parser.add_argument('--days', type=int, default=58)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    for kind, path in generate(args.out_dir, args.rows, args.branches, args.years, args.days, args.seed).items():
+        print(f'{kind:<9}{os.path.getsize(path):>14,}  {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+import gzip
+import hashlib
+import os
+
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+# static: plotly.js يُخدم مرة واحدة من مسار محلي مع كاش طويل
+# inline: السلوك القديم، المكتبة كاملة داخل كل مخطط
+PLOTLYJS_MODE = os.environ.get('DASHBOARD_PLOTLYJS', 'static')
+PLOTLYJS_VERSION = get_plotlyjs_version()
+PLOTLYJS_URL = f'/assets/plotly-{PLOTLYJS_VERSION}.min.js'
+CHART_CONFIG = {'staticPlot': True, 'displayModeBar': False}
+
+_bundle = None
+
+
+def plotlyjs_bundle():
+    global _bundle
+    if _bundle is None:
+        raw = get_plotlyjs().encode('utf-8')
+        _bundle = {'raw': raw, 'gzip': gzip.compress(raw, 9),
+                   'etag': hashlib.sha1(raw).hexdigest()[:16]}
+    return _bundle
+
+
+def plotlyjs_tag():
+    return f'<script src="{PLOTLYJS_URL}"></script>' if PLOTLYJS_MODE == 'static' else ''
+
+
+def chart_html(fig):
+    return fig.to_html(full_html=False, include_plotlyjs=PLOTLYJS_MODE != 'static', config=CHART_CONFIG)
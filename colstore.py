@@ -0,0 +1,242 @@
+import contextlib
+import fcntl
+import hashlib
+import io
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get('DASHBOARD_CACHE_DIR', os.path.join(BASE_DIR, '.cache'))
+FORMAT = 1
+
+
+def file_hash(path, limit=None):
+    h = hashlib.sha1()
+    remaining = limit
+    with open(path, 'rb') as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(1 << 20 if remaining is None else min(1 << 20, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return h.hexdigest()
+
+
+def source_key(path):
+    st = os.stat(path)
+    return {'path': os.path.basename(path), 'size': st.st_size, 'mtime': st.st_mtime_ns}
+
+
+def version(paths):
+    h = hashlib.sha1()
+    for p in paths:
+        k = source_key(p)
+        h.update(f"{k['path']}:{k['size']}:{k['mtime']};".encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def _same_stat(a, b):
+    return a['path'] == b['path'] and a['size'] == b['size'] and a['mtime'] == b['mtime']
+
+
+# كل لقطة في مجلد مستقل، والملف current.json يشير إلى الحالية
+def _snap_root(name):
+    return os.path.join(CACHE_DIR, name)
+
+
+def _read_current(name):
+    try:
+        with open(os.path.join(_snap_root(name), 'current.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('format') != FORMAT:
+        return None
+    return meta
+
+
+def _encode_column(s, path):
+    dtype = str(s.dtype)
+    if s.dtype.kind in 'biufM':
+        np.save(path + '.npy', s.to_numpy())
+        return {'kind': 'array', 'dtype': dtype}
+    values = s.astype(object).where(s.notna(), None)
+    codes, cats = pd.factorize(values, use_na_sentinel=True)
+    cats = np.array([str(c).encode('utf-8') for c in cats], dtype=bytes)
+    if len(cats) <= len(s) // 2:
+        width = np.int8 if len(cats) < 127 else np.int16 if len(cats) < 32767 else np.int32
+        np.save(path + '.codes.npy', codes.astype(width))
+        np.save(path + '.cats.npy', cats)
+        return {'kind': 'category', 'dtype': dtype}
+    raw = np.array([b'' if v is None else str(v).encode('utf-8') for v in values], dtype=bytes)
+    np.save(path + '.npy', raw)
+    np.save(path + '.null.npy', codes < 0)
+    return {'kind': 'bytes', 'dtype': dtype}
+
+
+def _decode_column(spec, path):
+    if spec['kind'] == 'array':
+        return np.asarray(np.load(path + '.npy', mmap_mode='r'))
+    if spec['kind'] == 'category':
+        codes = np.asarray(np.load(path + '.codes.npy', mmap_mode='r'))
+        cats = pd.Index(np.char.decode(np.load(path + '.cats.npy'), 'utf-8'), dtype=spec['dtype'])
+        return pd.Categorical.from_codes(codes, cats).astype(spec['dtype'])
+    raw = np.char.decode(np.load(path + '.npy'), 'utf-8').astype(object)
+    raw[np.load(path + '.null.npy')] = None
+    return pd.array(raw, dtype=spec['dtype'])
+
+
+def save(name, df, sources, **extra):
+    root = _snap_root(name)
+    os.makedirs(root, exist_ok=True)
+    token = uuid.uuid4().hex[:12]
+    snap_dir = os.path.join(root, token)
+    os.makedirs(snap_dir)
+    columns = []
+    for i, col in enumerate(df.columns):
+        spec = _encode_column(df[col], os.path.join(snap_dir, f'c{i}'))
+        spec['name'] = col
+        columns.append(spec)
+    meta = {'format': FORMAT, 'token': token, 'rows': len(df), 'columns': columns,
+            'sources': sources, **extra}
+    _write_current(name, meta)
+    # العمال الذين فتحوا لقطة قديمة بـ mmap يحتفظون بها حتى بعد الحذف
+    for entry in os.listdir(root):
+        if entry != token and os.path.isdir(os.path.join(root, entry)):
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+    return meta
+
+
+def load(meta, name):
+    snap_dir = os.path.join(_snap_root(name), meta['token'])
+    data = {spec['name']: _decode_column(spec, os.path.join(snap_dir, f'c{i}'))
+            for i, spec in enumerate(meta['columns'])}
+    return pd.DataFrame(data, copy=False)
+
+
+@contextlib.contextmanager
+def _locked(name):
+    root = _snap_root(name)
+    os.makedirs(root, exist_ok=True)
+    with open(os.path.join(root, '.lock'), 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def cached(name, paths, build, **extra):
+    """يعيد build() من اللقطة إن لم تتغير الملفات المصدرية (الحجم والتوقيت ثم الهاش)."""
+    try:
+        with _locked(name):
+            return _cached(name, paths, build, extra)
+    except OSError:
+        # مجلد الكاش غير قابل للكتابة: نحلل المصدر مباشرة
+        return build()
+
+
+def lookup(name, paths):
+    """(الإطار، الميتا) إن كانت اللقطة صالحة للملفات المصدرية، وإلا None."""
+    try:
+        with _locked(name):
+            meta = _fresh(name, paths)
+            return None if meta is None else (load(meta, name), meta)
+    except OSError:
+        return None
+
+
+def cached_append(name, path, parse):
+    """مثل cached لكن لملف نصي يُضاف إليه في النهاية: تُحلل الأسطر الجديدة فقط."""
+    try:
+        with _locked(name):
+            return _cached_append(name, path, parse)
+    except OSError:
+        return parse(path)
+
+
+def _fresh(name, paths):
+    keys = [source_key(p) for p in paths]
+    meta = _read_current(name)
+    if meta is None or len(meta['sources']) != len(keys):
+        return None
+    if all(_same_stat(k, s) for k, s in zip(keys, meta['sources'])):
+        return meta
+    hashes = [file_hash(p) for p in paths]
+    if not all(h == s['sha1'] for h, s in zip(hashes, meta['sources'])):
+        return None
+    for k, h in zip(keys, hashes):
+        k['sha1'] = h
+    meta = dict(meta, sources=keys)
+    _write_current(name, meta)
+    return meta
+
+
+def _cached(name, paths, build, extra):
+    meta = _fresh(name, paths)
+    if meta is not None:
+        return load(meta, name)
+    keys = [source_key(p) for p in paths]
+    df = build()
+    for k, p in zip(keys, paths):
+        k['sha1'] = file_hash(p)
+    # نعيد النسخة المربوطة بالملفات لتتشارك العمليات نفس الصفحات في الذاكرة
+    return load(save(name, df, keys, **extra), name)
+
+
+def _cached_append(name, path, parse):
+    key = source_key(path)
+    meta = _read_current(name)
+    if meta is not None and len(meta['sources']) == 1:
+        old = meta['sources'][0]
+        if _same_stat(key, old):
+            return load(meta, name)
+        grown = key['size'] > old['size'] and meta.get('ends_nl')
+        if (grown or key['size'] == old['size']) and file_hash(path, old['size']) == old['sha1']:
+            if not grown:
+                key['sha1'] = old['sha1']
+                _write_current(name, dict(meta, sources=[key]))
+                return load(meta, name)
+            tail = _read_lines(path, old['size'], key)
+            if key['size'] == old['size']:
+                return load(meta, name)
+            df = pd.concat([load(meta, name), parse(io.BytesIO(tail))], ignore_index=True)
+            return _save_text(name, path, key, df)
+    return _save_text(name, path, key, parse(io.BytesIO(_read_lines(path, 0, key))))
+
+
+def _read_lines(path, start, key):
+    """البايتات [start, key['size']) فقط: ما يُلحق بعد الـ stat لا يدخل اللقطة وإلا لم يغطه size و sha1
+    وقُرئ مرة أخرى في الإضافة التالية. السطر الأخير غير المكتمل يُترك للمرة القادمة إن كان الملف
+    ما زال يُكتب؛ وإن لم يتغير فهو آخر سطر بلا \n، و ends_nl=False يعيد تحليل الملف كله عند أي إضافة.
+    يعدل key['size'] إلى ما قُرئ فعلاً."""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(key['size'] - start)
+    if not data.endswith(b'\n') and not _same_stat(source_key(path), key):
+        data = data[:data.rfind(b'\n') + 1]
+    key['size'] = start + len(data)
+    return data
+
+
+def _save_text(name, path, key, df):
+    key['sha1'] = file_hash(path, key['size'])
+    with open(path, 'rb') as f:
+        f.seek(max(key['size'] - 1, 0))
+        ends_nl = f.read(1) in (b'\n', b'')
+    return load(save(name, df, [key], ends_nl=ends_nl), name)
+
+
+def _write_current(name, meta):
+    root = _snap_root(name)
+    tmp = os.path.join(root, f'current.{uuid.uuid4().hex[:12]}.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(root, 'current.json'))
@@ -0,0 +1,178 @@
+import glob
+import logging
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+
+import colstore
+from alerting import AlertTimeline
+from forecast import SeasonalForecast
+from rangeindex import DailyIndex
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+log = logging.getLogger(__name__)
+
+DATA_DIR = os.environ.get('DASHBOARD_DATA_DIR', BASE_DIR)
+SOURCES_2025 = os.path.join(DATA_DIR, '2025_TIRE.csv')
+SOURCES_2026 = os.path.join(DATA_DIR, 'ج.xlsx')
+PROFIT_RATES_FILE = os.path.join(DATA_DIR, 'profit_rates.csv')
+DEFAULT_PROFIT_RATE = 0.30
+BRANCH_SALES_COL = re.compile(r'^مبيعات فرع (\d+) \| المجموع$')
+
+INVOICE_COLUMNS = ['SaleDate','SaleMonth','SaleYear','BranchName','BranchID','InvoiceID','TotalSales','TotalCost','TotalProfit','ItemCount']
+
+def parse_2025(source):
+    df = pd.read_csv(source, sep=';', header=None)
+    df.columns = INVOICE_COLUMNS
+    return normalize_invoices(df)
+
+def normalize_invoices(df, vat=1.15):
+    # نفس المخطط لكل مصادر الفواتير: بدون ضريبة، مع Month و branch_id
+    # vat=1 للمصادر التي مبالغها بدون ضريبة أصلاً
+    df['SaleDate'] = pd.to_datetime(df['SaleDate'])
+    df['TotalSales'] = pd.to_numeric(df['TotalSales'], errors='coerce').fillna(0) / vat
+    df['TotalCost'] = pd.to_numeric(df['TotalCost'], errors='coerce').fillna(0) / vat
+    df['TotalProfit'] = pd.to_numeric(df['TotalProfit'], errors='coerce').fillna(0) / vat
+    df['Month'] = df['SaleDate'].dt.strftime('%Y-%m')
+    df['branch_id'] = df['BranchName'].str.extract(r'(\d+)')
+    return df
+
+def load_2025():
+    return colstore.cached_append('2025_tire', SOURCES_2025, parse_2025)
+
+def load_profit_rates(path=PROFIT_RATES_FILE):
+    return pd.read_csv(path, sep=';', dtype={'branch_id': str, 'Month': str, 'rate': float})
+
+def parse_2026_daily(path=SOURCES_2026, rates=None, year=2026):
+    if rates is None:
+        rates = load_profit_rates()
+    df = pd.read_excel(path, header=2)
+    # كل أعمدة «مبيعات فرع N | المجموع» مهما كان عدد الفروع
+    cols = {c: m.group(1) for c in df.columns if (m := BRANCH_SALES_COL.match(str(c)))}
+    cols = dict(sorted(cols.items(), key=lambda kv: int(kv[1])))
+    df = df[['التاريخ', *cols]].rename(columns=cols)
+    df = df[df['التاريخ'].notna()]
+    df['التاريخ'] = pd.to_datetime(df['التاريخ'], dayfirst=True, errors='coerce')
+    df = df[df['التاريخ'].notna()]
+    df = df[df['التاريخ'].dt.year == year]
+    wide = df.set_index('التاريخ').apply(pd.to_numeric, errors='coerce').fillna(0)
+    # من عريض إلى طويل: صف لكل (يوم، فرع) بنفس ترتيب الملف
+    out = wide.stack().rename('TotalSales').rename_axis(['SaleDate', 'branch_id']).reset_index()
+    out['Month'] = out['SaleDate'].dt.strftime('%Y-%m')
+    out['BranchName'] = 'فرع ' + out['branch_id']
+    out['TotalSales'] = out['TotalSales'] / 1.15
+    rate = out[['branch_id', 'Month']].merge(rates, on=['branch_id', 'Month'], how='left')['rate']
+    out['TotalProfit'] = out['TotalSales'] * rate.fillna(DEFAULT_PROFIT_RATE).to_numpy()
+    out['TotalCost'] = out['TotalSales'] - out['TotalProfit']
+    return out[['SaleDate','Month','branch_id','BranchName','TotalSales','TotalCost','TotalProfit']]
+
+def load_2026_daily():
+    return colstore.cached('2026_daily', [SOURCES_2026, PROFIT_RATES_FILE], lambda: parse_2026_daily(SOURCES_2026))
+
+
+def source_paths():
+    return [SOURCES_2025, SOURCES_2026, PROFIT_RATES_FILE]
+
+
+def data_version():
+    # نسخة البيانات (والكود) تدخل في مفاتيح كاش الصفحات وفي الـ ETag
+    return colstore.version([*source_paths(), *sorted(glob.glob(os.path.join(BASE_DIR, '*.py')))])
+
+
+class Snapshot:
+    """كل ما تحتاجه الصفحات من بيانات، يُبنى مرة ولا يُعدل بعدها."""
+
+    def __init__(self, df25, df26, version, previous=None):
+        self.df25 = df25
+        self.df26 = df26
+        self.version = version
+
+        # بيانات يومية كاملة
+        daily25 = df25.groupby(['branch_id','BranchName','SaleDate']).agg(
+            sales=('TotalSales','sum'), cost=('TotalCost','sum'), profit=('TotalProfit','sum'), invoices=('InvoiceID','nunique')
+        ).reset_index()
+        daily25['Month'] = daily25['SaleDate'].dt.strftime('%Y-%m')
+
+        daily26 = df26.groupby(['branch_id','BranchName','SaleDate']).agg(
+            sales=('TotalSales','sum'), cost=('TotalCost','sum'), profit=('TotalProfit','sum')
+        ).reset_index()
+        daily26['invoices'] = 0
+        daily26['Month'] = daily26['SaleDate'].dt.strftime('%Y-%m')
+
+        self.all_daily = pd.concat([daily25, daily26], ignore_index=True)
+        self.daily_index = DailyIndex(self.all_daily)
+        # خط التنبيهات يبني على خط اللقطة السابقة فلا يُحسب إلا ما تغير
+        self.alerts = AlertTimeline(self.daily_index, previous.alerts if previous is not None else None)
+        self.forecast = SeasonalForecast(self.daily_index)
+
+        # ملخص شهري
+        self.monthly25 = df25.groupby(['branch_id','Month','BranchName']).agg(
+            sales=('TotalSales','sum'), cost=('TotalCost','sum'),
+            profit=('TotalProfit','sum'), invoices=('InvoiceID','nunique')
+        ).reset_index()
+
+        self.branches = sorted(self.all_daily['branch_id'].unique())
+        self.min_date = self.all_daily['SaleDate'].min().strftime('%Y-%m-%d')
+        self.max_date = self.all_daily['SaleDate'].max().strftime('%Y-%m-%d')
+
+
+def build_snapshot(previous=None):
+    start = time.perf_counter()
+    version = data_version()
+    snap = Snapshot(load_2025(), load_2026_daily(), version, previous)
+    snap.load_seconds = time.perf_counter() - start
+    return snap
+
+
+class SnapshotStore:
+    """يحمل اللقطة الحالية ويعيد بناءها في الخلفية عند تغير الملفات المصدرية.
+
+    الاستبدال إسناد مرجع واحد، فكل طلب يقرأ store.current مرة ويرى لقطة كاملة.
+    """
+
+    def __init__(self, build=build_snapshot, version=data_version, interval=10):
+        self.build = build
+        self.version = version
+        self.interval = interval
+        self.current = build()
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._forked = False
+
+    def refresh(self):
+        with self._lock:
+            if self.version() == self.current.version:
+                return False
+            snap = self.build(self.current)
+            self.current = snap
+            self.reloads += 1
+            log.info('data reloaded: version %s', snap.version)
+            return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception:
+                # ملف في منتصف الكتابة مثلاً: نبقي اللقطة القديمة ونحاول لاحقاً
+                log.exception('data reload failed')
+
+    def start(self):
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._watch, name='data-watcher', daemon=True)
+        self._thread.start()
+        if not self._forked:
+            # gunicorn --preload: الخيط لا ينتقل مع fork، فنشغله من جديد في كل عامل
+            self._forked = True
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.start()
@@ -0,0 +1,200 @@
+"""توقع المبيعات اليومية لكل الفروع دفعة واحدة: مستوى حديث × موسمية أيام الأسبوع والأشهر.
+
+    sales[b, t] = level[b] × shape[b, t]
+
+الشكل (أثر يوم الأسبوع والشهر) يُقدر من كل التاريخ بالمربعات الصغرى في لوغاريتم
+المبيعات مع ridge، وأثر الشهر لا يُقدر إلا من سنتين (مع سنة واحدة لا يُفصل عن تغير
+المستوى). معادلات كل الفروع تُبنى بضرب مصفوفة واحد (w @ outer(X)) وتُحل بـ
+np.linalg.solve على دفعة، بلا حلقة على الفروع.
+المستوى لا يُستخرج من الانحدار: هو متوسط sales / shape في آخر LEVEL_WINDOW يوماً،
+أو منذ آخر تغير واضح في المستوى إن كان أقرب (SHIFT_*)، فلا تختلط فترتان بمستويين
+مختلفين. يُقدر مرة لكل لقطة بيانات (أي لكل إصدار) ويُستعمل لأي أفق.
+"""
+import time
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+DAY = np.timedelta64(1, 'D')
+RIDGE = 10.0
+LEVEL_WINDOW = 28
+SHIFT_WINDOW = 56
+SHIFT_MIN_DAYS = 7
+SHIFT_T = 2.5
+SHIFT_MIN = 0.6
+LOW_RATIO = 0.05
+MIN_DAYS = 14
+LEVEL = 0.8
+MAX_HORIZON = 366
+
+
+def calendar(index, col='sales'):
+    """شبكة (فرع × يوم تقويمي) من DailyIndex، والقناع = أيام فيها بيانات."""
+    days = np.arange(index.days[0], index.days[-1] + DAY, DAY) if len(index.days) else index.days[:0]
+    pos = ((index.days - index.days[0]) // DAY).astype(np.int64) if len(index.days) else np.zeros(0, np.int64)
+    y = np.zeros((len(index.branches), len(days)))
+    mask = np.zeros(y.shape, dtype=bool)
+    y[:, pos] = index.grid[col]
+    mask[:, pos] = index.grid['rows'] > 0
+    return days, y, mask
+
+
+def design(days):
+    """ثابت، ثم 7 أعمدة لأيام الأسبوع (الاثنين أولاً) و12 للأشهر."""
+    d = days.astype('datetime64[D]').astype(np.int64)
+    weekday = (d + 3) % 7
+    month = days.astype('datetime64[M]').astype(np.int64) % 12
+    X = np.zeros((len(days), 1 + 7 + 12))
+    X[:, 0] = 1
+    X[np.arange(len(days)), 1 + weekday] = 1
+    X[np.arange(len(days)), 8 + month] = 1
+    return X
+
+
+def shift_start(z, seen, min_days=SHIFT_MIN_DAYS, t_crit=SHIFT_T, min_shift=SHIFT_MIN):
+    """عدد الأيام الأخيرة منذ آخر تغير في متوسط z لكل فرع، أو طول النافذة إن لم يتغير.
+
+    تقسيم ثنائي من النهاية: أقوى نقطة تقسيم (اختبار t بين ما قبلها وما بعدها) تُقبل
+    إن تجاوزت t_crit وكان الفرق أكبر من min_shift، ثم يُبحث في الجزء الأخير وحده.
+    """
+    B, W = z.shape
+    rows = np.arange(B)
+
+    def tail_sums(a):
+        # [:, k] = مجموع آخر k يوماً
+        return np.concatenate([np.zeros((B, 1)), np.cumsum(a[:, ::-1], axis=1)], axis=1)
+
+    c, s1, s2 = tail_sums(seen), tail_sums(z * seen), tail_sums(z * z * seen)
+    n = np.full(B, W)
+    while True:
+        cn, s1n, s2n = c[rows, n][:, None], s1[rows, n][:, None], s2[rows, n][:, None]
+        ca, cb = c, cn - c
+        ok = (ca >= min_days) & (cb >= min_days) & (np.arange(W + 1) < n[:, None])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            after, before = s1 / ca, (s1n - s1) / cb
+            ss = (s2 - s1 ** 2 / ca) + (s2n - s2 - (s1n - s1) ** 2 / cb)
+            t = np.abs(after - before) / np.sqrt(ss / (cn - 2) * (1 / ca + 1 / cb))
+        t = np.where(ok & (np.abs(after - before) > min_shift), np.nan_to_num(t), 0)
+        k = t.argmax(axis=1)
+        cut = t[rows, k] > t_crit
+        if not cut.any():
+            return n
+        n = np.where(cut, k, n)
+
+
+def fit(days, y, mask, ridge=RIDGE):
+    """معاملات كل الفروع من شبكة (فرع × يوم). الأيام خارج القناع لا تدخل التقدير."""
+    w = (mask & (y > 0)).astype(float)
+    z = np.log(np.where(w > 0, y, 1))
+    X = design(days)
+    T, p = X.shape
+    # أثر الشهر لا يُفصل عن المستوى إلا إذا رآه الفرع في سنتين على الأقل؛ غير ذلك يُثبت عند الصفر
+    years = days.astype('datetime64[Y]').astype(np.int64)
+    cell = (years - years[0]) * 12 + X[:, 8:].argmax(axis=1)
+    seen = (w @ np.eye((years[-1] - years[0] + 1) * 12)[cell]) > 0
+    seen_years = seen.reshape(len(y), -1, 12).sum(axis=1)
+    penalty = np.full((len(y), p), float(ridge))
+    penalty[:, 0] = 1e-9
+    penalty[:, 8:][seen_years < 2] = 1e9
+    # معادلات كل الفروع بضرب واحد: A[b] = Σt w[b,t]·x_t·x_tᵀ
+    outer = (X[:, :, None] * X[:, None, :]).reshape(T, p * p)
+    A = (w @ outer).reshape(-1, p, p)
+    A[:, np.arange(p), np.arange(p)] += penalty
+    beta = np.linalg.solve(A, ((w * z) @ X)[..., None])[..., 0]
+    beta[:, 0] = 0
+    # المستوى: متوسط sales / shape في الأيام الأخيرة، لا الثابت المقدر من كل التاريخ
+    window = slice(max(T - SHIFT_WINDOW, 0), T)
+    observed = mask[:, window]
+    count = observed.sum(axis=1)
+    ratio = np.where(observed, y[:, window] / np.exp(beta @ X[window].T), 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        floor = LOW_RATIO * ratio.sum(axis=1, keepdims=True) / count[:, None]
+        lz = np.where(observed, np.log(np.maximum(ratio, floor)), 0)
+    start = shift_start(lz, observed)
+    recent = np.arange(observed.shape[1])[::-1] < np.minimum(start, LEVEL_WINDOW)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        level = (ratio * recent).sum(axis=1) / (observed & recent).sum(axis=1)
+        beta[:, 0] = np.log(level)
+        # تشتت ما بعد آخر تغير حول متوسطه، وارتباط بواقي يومين متتاليين: نطاق مجموع عدة أيام أوسع
+        segment = observed & (np.arange(observed.shape[1])[::-1] < start[:, None])
+        m = segment.sum(axis=1)
+        resid = (lz - (lz * segment).sum(axis=1, keepdims=True) / m[:, None]) * segment
+        sigma = np.sqrt((resid ** 2).sum(axis=1) / (m - 1))
+        both = segment[:, 1:] & segment[:, :-1]
+        rho = (resid[:, 1:] * resid[:, :-1] * both).sum(axis=1) / np.sqrt(
+            (resid[:, 1:] ** 2 * both).sum(axis=1) * (resid[:, :-1] ** 2 * both).sum(axis=1))
+        rho = np.clip(np.nan_to_num(rho), 0, 0.95)
+        # تباين المستوى نفسه (متوسط أيام قليلة مترابطة) نسبةً إلى مربعه؛ يتكرر في كل أيام الأفق
+        level_var = np.expm1(sigma ** 2) / (observed & recent).sum(axis=1) * (1 + rho) / (1 - rho)
+    n = w.sum(axis=1)
+    valid = (n >= MIN_DAYS) & (level > 0) & np.isfinite(sigma)
+    return {'beta': beta, 'sigma': sigma, 'rho': rho, 'level_var': level_var, 'n': n, 'valid': valid,
+            'last': days[-1], 'level_days': np.minimum(start, LEVEL_WINDOW)}
+
+
+def predict(params, days):
+    """متوسط المبيعات المتوقع لكل (فرع، يوم) وانحرافه، ووسيطه (log) من توزيع log-normal."""
+    log_mean = params['beta'] @ design(days).T
+    s2 = (params['sigma'] ** 2)[:, None]
+    mean = np.exp(log_mean)
+    var = (np.exp(s2) - 1) * mean ** 2
+    mean[~params['valid']] = np.nan
+    return log_mean - s2 / 2, mean, var
+
+
+def total_sd(params, mean, var):
+    """انحراف مجموع أيام الأفق لكل فرع؛ بأخطاء AR(1): Σ var × (1 + 2·Σk (1 - k/H)·ρ^k)،
+    مع خطأ تقدير المستوى الذي يتكرر في كل يوم: level_var × (Σ mean)²."""
+    horizon = var.shape[1]
+    k = np.arange(1, horizon)
+    inflate = 1 + 2 * ((1 - k / horizon) * params['rho'][:, None] ** k).sum(axis=1)
+    return np.sqrt(var.sum(axis=1) * inflate + params['level_var'] * mean.sum(axis=1) ** 2)
+
+
+class SeasonalForecast:
+    """معاملات النموذج لكل الفروع من DailyIndex لقطة واحدة، وتوقعات لأي أفق منها."""
+
+    def __init__(self, index, ridge=RIDGE):
+        self.branches = index.branches
+        self.names = index.names
+        start = time.perf_counter()
+        days, y, mask = calendar(index)
+        self.params = fit(days, y, mask, ridge) if len(days) else None
+        self.fit_seconds = time.perf_counter() - start
+
+    def _horizon(self, horizon, start=None):
+        if not 1 <= horizon <= MAX_HORIZON:
+            raise ValueError(f'horizon must be between 1 and {MAX_HORIZON}')
+        first = self.params['last'] + DAY if start is None else np.datetime64(pd.Timestamp(start))
+        return np.arange(first, first + horizon * DAY, DAY)
+
+    def _branch_mask(self, branch):
+        if branch is None or branch == 'all':
+            return np.ones(len(self.branches), dtype=bool)
+        return self.branches == branch
+
+    def daily(self, horizon=7, branch=None, level=LEVEL, start=None):
+        """توقع كل يوم من الأيام القادمة مع نطاق level حول الوسيط."""
+        days = self._horizon(horizon, start)
+        keep = self._branch_mask(branch) & self.params['valid']
+        mu, mean, _ = predict(self.params, days)
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+        sigma = self.params['sigma'][:, None]
+        b, d = np.nonzero(np.broadcast_to(keep[:, None], mean.shape))
+        return pd.DataFrame({'SaleDate': days[d], 'branch_id': self.branches[b], 'BranchName': self.names[b],
+                             'forecast': mean[b, d], 'lower': np.exp(mu - z * sigma)[b, d],
+                             'upper': np.exp(mu + z * sigma)[b, d]})
+
+    def totals(self, horizon=7, branch=None, level=LEVEL, start=None):
+        """مجموع الأفق لكل فرع مع نطاق level (تقريب طبيعي لمجموع الأيام مع ارتباطها)."""
+        days = self._horizon(horizon, start)
+        keep = self._branch_mask(branch) & self.params['valid']
+        _, mean, var = predict(self.params, days)
+        total = mean.sum(axis=1)
+        sd = total_sd(self.params, mean, var)
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+        return pd.DataFrame({'branch_id': self.branches[keep], 'BranchName': self.names[keep],
+                             'forecast': total[keep], 'lower': np.maximum(total - z * sd, 0)[keep],
+                             'upper': (total + z * sd)[keep],
+                             'level_days': self.params['level_days'][keep]})
@@ -0,0 +1,123 @@
+"""توقيت مراحل كل طلب، ومخرجات /metrics بصيغة Prometheus النصية.
+
+العدادات لكل عملية؛ مع gunicorn يجمعها Prometheus من كل عامل على حدة.
+"""
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+
+from flask import Response, g, request
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# ?profile=1 يكشف مسارات الملفات ويتجاوز الكاش، فلا يعمل إلا بـ DASHBOARD_PROFILE=1
+PROFILE_ENABLED = os.environ.get('DASHBOARD_PROFILE', '0') == '1'
+PROFILE_LINES = 40
+
+
+class Histogram:
+    def __init__(self, name, help, labels, buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted(self._series.items())
+            for labels, (counts, total, count) in items:
+                base = ','.join(f'{k}="{v}"' for k, v in zip(self.labels, labels))
+                for bound, n in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {n}')
+                lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {count}')
+                lines.append(f'{self.name}_sum{{{base}}} {total:.6f}')
+                lines.append(f'{self.name}_count{{{base}}} {count}')
+        return lines
+
+
+stage_seconds = Histogram('dashboard_stage_seconds', 'Time spent in each stage of a request.', ('route', 'stage'))
+request_seconds = Histogram('dashboard_request_seconds', 'Total request time, including cached responses.', ('route',))
+
+
+class StageTimer:
+    """lap(name) يسجل الزمن منذ آخر lap كمرحلة من الطلب الحالي (في الهستوغرام وفي g.stages)."""
+
+    def __init__(self):
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        elapsed, self._last = now - self._last, now
+        stage_seconds.observe(elapsed, request.endpoint or '', name)
+        g.setdefault('stages', []).append((name, elapsed))
+
+
+def init_app(app):
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _observe(resp):
+        start = g.pop('request_start', None)
+        if start is not None and request.endpoint:
+            request_seconds.observe(time.perf_counter() - start, request.endpoint)
+        return resp
+
+
+def profiled(view):
+    """?profile=1 يعيد ملخص cProfile لهذا الطلب وحده بدلاً من الصفحة، متجاوزاً كاش الصفحات."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not PROFILE_ENABLED or request.args.get('profile') != '1':
+            return view(*args, **kwargs)
+        g.no_cache = True
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            view(*args, **kwargs)
+        finally:
+            profiler.disable()
+        total = time.perf_counter() - start
+        out = io.StringIO()
+        out.write(f'{request.full_path}  total {total * 1000:.1f} ms\n\n')
+        for name, elapsed in g.get('stages', []):
+            out.write(f'  {name:<12}{elapsed * 1000:>10.2f} ms\n')
+        out.write('\n')
+        pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(PROFILE_LINES)
+        return Response(out.getvalue(), mimetype='text/plain')
+    return wrapper
+
+
+def render(store, page_cache):
+    snap = store.current
+    lines = stage_seconds.render() + request_seconds.render()
+    lines += ['# HELP dashboard_data_load_seconds Time to build the current data snapshot.',
+              '# TYPE dashboard_data_load_seconds gauge',
+              f'dashboard_data_load_seconds {snap.load_seconds:.6f}',
+              '# HELP dashboard_data_reloads_total Snapshots rebuilt after the source files changed.',
+              '# TYPE dashboard_data_reloads_total counter',
+              f'dashboard_data_reloads_total {store.reloads}']
+    stats = page_cache.stats()
+    for key in ('hits', 'misses', 'evictions', 'not_modified'):
+        lines += [f'# TYPE dashboard_page_cache_{key}_total counter', f'dashboard_page_cache_{key}_total {stats[key]}']
+    lines += ['# TYPE dashboard_page_cache_bytes gauge', f'dashboard_page_cache_bytes {stats["bytes"]}']
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
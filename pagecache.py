@@ -0,0 +1,105 @@
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import Response, g, request
+
+
+class LRUCache:
+    """كاش LRU محدود بعدد البايتات، مع عدادات للإصابة والإخفاق والطرد."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, nbytes):
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._items[key] = (value, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, n) = self._items.popitem(last=False)
+                self.size -= n
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self._items), 'bytes': self.size, 'max_bytes': self.max_bytes}
+
+
+class PageCache:
+    """كاش الصفحات المولدة بمفتاح (المسار، المعاملات، نسخة البيانات).
+
+    version() تعيد نسخة البيانات الحالية؛ عند تغيرها يُفرغ الكاش وتتغير كل الـ ETag.
+    """
+
+    def __init__(self, version, max_bytes):
+        self.version = version
+        self.lru = LRUCache(max_bytes)
+        self._seen = None
+        self.not_modified = 0
+
+    def key(self, route, params):
+        args = tuple(sorted((k, v) for k in params for v in request.args.getlist(k)))
+        return (route, args, self.version())
+
+    @staticmethod
+    def etag(key):
+        return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:20]
+
+    def _respond(self, body, etag):
+        resp = Response(body, mimetype='text/html')
+        resp.set_etag(etag)
+        resp.headers['Cache-Control'] = 'no-cache'
+        return resp.make_conditional(request)
+
+    def cached(self, params=()):
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if g.get('no_cache'):
+                    return view(*args, **kwargs)
+                key = self.key(view.__name__, params)
+                if key[2] != self._seen:
+                    self.lru.clear()
+                    self._seen = key[2]
+                etag = self.etag(key)
+                if request.if_none_match.contains(etag):
+                    self.not_modified += 1
+                    return self._respond(b'', etag)
+                body = self.lru.get(key)
+                if body is None:
+                    body = view(*args, **kwargs).encode('utf-8')
+                    self.lru.put(key, body, len(body))
+                return self._respond(body, etag)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        return dict(self.lru.stats(), not_modified=self.not_modified, version=self._seen)
@@ -0,0 +1,28 @@
+"""الأرقام خلف الصفحات، مشتركة بين صفحات HTML وواجهة /api."""
+
+# الفترتان الافتراضيتان في /compare؛ نهاية الثانية هي آخر يوم في البيانات
+COMPARE_DEFAULTS = ('2026-01-01', '2026-01-31', '2026-02-01')
+
+
+def dashboard_summary(data, branch, date_from, date_to):
+    branch_summary = data.daily_index.totals(date_from, date_to, branch)
+    totals = {
+        'invoices': branch_summary['invoices'].sum(),
+        'sales': branch_summary['sales'].sum(),
+        'cost': branch_summary['cost'].sum(),
+        'profit': branch_summary['profit'].sum(),
+    }
+    totals['profit_pct'] = (totals['profit'] / totals['sales'] * 100) if totals['sales'] > 0 else 0
+    branch_summary['profit_pct'] = (branch_summary['profit'] / branch_summary['sales'] * 100).round(1)
+    daily = data.daily_index.daily(date_from, date_to, branch)
+    return totals, branch_summary, daily
+
+
+def compare_periods(data, date_from1, date_to1, date_from2, date_to2):
+    p1 = data.daily_index.totals(date_from1, date_to1)[['branch_id','sales','profit']]
+    p2 = data.daily_index.totals(date_from2, date_to2)[['branch_id','sales','profit']]
+    merged = p1.merge(p2, on='branch_id', suffixes=('_p1','_p2'))
+    merged['cs'] = ((merged['sales_p2']-merged['sales_p1'])/merged['sales_p1']*100).round(1)
+    merged['cp'] = ((merged['profit_p2']-merged['profit_p1'])/merged['profit_p1']*100).round(1)
+    merged['BranchName'] = 'فرع ' + merged['branch_id']
+    return merged
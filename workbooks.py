@@ -0,0 +1,204 @@
+"""استيراد ملفات Excel الإضافية (1_1..4_2.xlsx، 2025.xlsx، Book100000.xlsx).
+
+    python workbooks.py [--workers N] [ملفات ...]
+
+نوعان من الملفات:
+- «الحركة اليومية» (2025.xlsx، Book100000.xlsx): سطر لكل مادة في الفاتورة،
+  يتحول إلى نفس مخطط load_2025 ويُطابق مع 2025_TIRE.csv.
+- «أرباح المواد» (N_M.xlsx): أرباح مواد فرع واحد لفترة، تتحول إلى مجاميع
+  الفرع للفترة وتُطابق مع profit_rates.csv.
+
+كل ملف يُحلل بـ openpyxl في وضع القراءة فقط (صفاً صفاً) داخل عملية مستقلة،
+والنتيجة تُحفظ في colstore فلا يُعاد تحليل ملف لم يتغير.
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from openpyxl import load_workbook
+
+import colstore
+import dataset
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MOVEMENT_FILES = ['2025.xlsx', 'Book100000.xlsx']
+BRANCH_PROFIT_FILES = [f'{b}_{p}.xlsx' for b in range(1, 5) for p in range(1, 3)]
+
+MOVEMENT_TITLE = 'الحركة اليومية'
+BRANCH_PROFIT_TITLE = 'أرباح المواد'
+PERIOD = re.compile(r'(\d{2}/\d{2}/\d{4}).*?(\d{2}/\d{2}/\d{4})')
+BRANCH = re.compile(r'(\d+)\s*-\s*فرع\s*:\s*(\d+)')
+BRANCH_LABEL = re.compile(r'مبيعات فرع (\d+)')
+PARSE_VERSION = 2
+
+PROFIT_COLUMNS = ['branch_id', 'BranchName', 'date_from', 'date_to', 'Month', 'group', 'quantity', 'sales', 'cost', 'profit']
+
+
+def _rows(path):
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from wb.worksheets[0].iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def parse_movement(path):
+    """سطور الفواتير من تقرير «الحركة اليومية» بمخطط load_2025."""
+    rows = _rows(path)
+    header = None
+    for row in rows:
+        if row and row[0] == 'الرقم':
+            header = {name: i for i, name in enumerate(row) if name}
+            break
+    records = []
+    date = invoice = None
+    for row in rows:
+        # سطور المواد مرقمة؛ المجاميع في آخر التقرير ليست كذلك
+        if not isinstance(row[0], int):
+            continue
+        # السطر الثاني وما بعده من نفس الفاتورة بلا تاريخ ولا رقم فاتورة
+        if isinstance(row[header['فواتير']], str):
+            date, invoice = row[header['التاريخ']], row[header['فواتير']]
+        m = BRANCH.search(row[header['فرع']] or '')
+        if m is None or date is None:
+            continue
+        qty = row[header['الكمية']] or 0
+        sales = row[header['المجموع']] or 0
+        cost = qty * (row[header['آخر شراء']] or 0)
+        records.append((date, date.month, date.year, f'فرع {int(m.group(2))}', m.group(1),
+                        invoice, sales, cost, sales - cost, 1))
+    # «المجموع» و«آخر شراء» بدون ضريبة أصلاً (المجموع = قيمة الفاتورة / 1.15)
+    return dataset.normalize_invoices(pd.DataFrame(records, columns=dataset.INVOICE_COLUMNS), vat=1)
+
+
+def parse_branch_profit(path):
+    """مجاميع مبيعات وكلفة وأرباح كل مجموعة مواد لفرع واحد خلال فترة التقرير."""
+    rows = _rows(path)
+    header = period = branch = None
+    records = []
+    for row in rows:
+        first = row[0]
+        if header is None:
+            m = PERIOD.search(first) if isinstance(first, str) else None
+            if m:
+                period = [pd.to_datetime(d, dayfirst=True) for d in m.groups()]
+            elif first == 'الرقم':
+                header = {name: i for i, name in enumerate(row) if name}
+            continue
+        if first == 0:
+            label = next((v for v in row if isinstance(v, str) and BRANCH_LABEL.search(v)), None)
+            branch = BRANCH_LABEL.search(label).group(1) if label else None
+            continue
+        if not isinstance(first, int) or branch is None:
+            continue
+        records.append((branch, f'فرع {branch}', period[0], period[1], period[0].strftime('%Y-%m'),
+                        row[header['اسم المجموعة']], row[header['الكمية 1']] or 0,
+                        row[header['المبيعات']] or 0, row[header['كلفة المبيعات']] or 0, row[header['الأرباح']] or 0))
+    return pd.DataFrame(records, columns=PROFIT_COLUMNS)
+
+
+def detect(path):
+    rows = _rows(path)
+    title = next(rows)[0]
+    rows.close()
+    if title == MOVEMENT_TITLE:
+        return 'movement'
+    if title == BRANCH_PROFIT_TITLE:
+        return 'branch_profit'
+    raise ValueError(f'{os.path.basename(path)}: unknown report type {title!r}')
+
+
+PARSERS = {'movement': parse_movement, 'branch_profit': parse_branch_profit}
+
+
+def _parse(path):
+    start = time.perf_counter()
+    kind = detect(path)
+    df = PARSERS[kind](path)
+    return kind, df, time.perf_counter() - start
+
+
+def _cache_name(path):
+    # يتغير الإصدار مع تغير المحللات فلا تُقرأ لقطات حُللت بمنطق قديم
+    return f'wb{PARSE_VERSION}_' + os.path.splitext(os.path.basename(path))[0]
+
+
+def ingest(paths=None, workers=None):
+    """يحمل الملفات بالتوازي ويعيد (الفواتير، أرباح الفروع، التوقيتات).
+
+    الملفات التي لها لقطة صالحة في colstore لا تُرسل إلى مجمع العمليات أصلاً.
+    """
+    if paths is None:
+        paths = [os.path.join(BASE_DIR, f) for f in MOVEMENT_FILES + BRANCH_PROFIT_FILES]
+    paths = [p for p in paths if os.path.exists(p)]
+    frames = {'movement': [], 'branch_profit': []}
+    timings = []
+    stale = []
+    for path in paths:
+        start = time.perf_counter()
+        hit = colstore.lookup(_cache_name(path), [path])
+        if hit is None:
+            stale.append(path)
+            continue
+        df, meta = hit
+        frames[meta['kind']].append(df)
+        timings.append({'file': os.path.basename(path), 'kind': meta['kind'], 'rows': len(df),
+                        'seconds': time.perf_counter() - start, 'cached': True})
+    if stale:
+        with ProcessPoolExecutor(max_workers=min(len(stale), workers or os.cpu_count() or 1)) as pool:
+            for path, (kind, df, seconds) in zip(stale, pool.map(_parse, stale)):
+                df = colstore.cached(_cache_name(path), [path], lambda: df, kind=kind)
+                frames[kind].append(df)
+                timings.append({'file': os.path.basename(path), 'kind': kind, 'rows': len(df),
+                                'seconds': seconds, 'cached': False})
+    invoices = pd.concat(frames['movement'], ignore_index=True) if frames['movement'] \
+        else pd.DataFrame(columns=dataset.INVOICE_COLUMNS + ['Month', 'branch_id'])
+    branch_profit = pd.concat(frames['branch_profit'], ignore_index=True) if frames['branch_profit'] \
+        else pd.DataFrame(columns=PROFIT_COLUMNS)
+    return invoices, branch_profit, pd.DataFrame(timings)
+
+
+def reconcile_invoices(invoices, reference):
+    """مبيعات وتكلفة وعدد السطور لكل (فرع، شهر) في الملفات مقابل 2025_TIRE.csv."""
+    def totals(df):
+        return df.groupby(['branch_id', 'Month']).agg(
+            sales=('TotalSales', 'sum'), cost=('TotalCost', 'sum'), lines=('TotalSales', 'size'))
+    out = totals(invoices).join(totals(reference), how='inner', lsuffix='_xlsx', rsuffix='_csv').reset_index()
+    out['sales_diff'] = (out['sales_xlsx'] - out['sales_csv']).round(2)
+    out['cost_diff'] = (out['cost_xlsx'] - out['cost_csv']).round(2)
+    out['lines_diff'] = out['lines_xlsx'] - out['lines_csv']
+    return out
+
+
+def reconcile_rates(branch_profit, rates):
+    """نسبة الربح المحسوبة من «أرباح المواد» مقابل profit_rates.csv."""
+    out = branch_profit.groupby(['branch_id', 'Month']).agg(sales=('sales', 'sum'), profit=('profit', 'sum')).reset_index()
+    out['rate_xlsx'] = (out['profit'] / out['sales']).round(4)
+    out = out.merge(rates, on=['branch_id', 'Month'], how='left').rename(columns={'rate': 'rate_table'})
+    out['rate_diff'] = (out['rate_xlsx'] - out['rate_table']).round(4)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='*')
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    invoices, branch_profit, timings = ingest([os.path.abspath(f) for f in args.files] or None, args.workers)
+    total = time.perf_counter() - start
+    with pd.option_context('display.width', 200, 'display.max_rows', 200):
+        print(timings.to_string(index=False, formatters={'seconds': '{:.3f}'.format}))
+        print(f'\ntotal {total:.3f}s\n')
+        if not invoices.empty:
+            print(reconcile_invoices(invoices, dataset.load_2025()).to_string(index=False))
+            print()
+        if not branch_profit.empty:
+            print(reconcile_rates(branch_profit, dataset.load_profit_rates()).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()